@@ -14,7 +14,8 @@ Features:
 
 import tkinter as tk
 from tkinter import ttk, Canvas, Scrollbar
-from PIL import Image, ImageTk
+from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
 import duckdb
 from pathlib import Path
 import sys
@@ -24,6 +25,49 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from src.config import AGGREGATED_DIR, FIGURES_DIR
 
+# Decoded, already-scaled tab images keyed by (path, mtime)
+_IMG_CACHE = {}
+
+# Background pool for PNG decode/resize (Pillow releases the GIL while decoding)
+_IMG_POOL = ThreadPoolExecutor(max_workers=4)
+
+
+def prepare_thumbnail(image_path, max_width=1200, max_height=650):
+    """
+    Make sure a *.thumb.png scaled to fit max_width x max_height sits next to
+    image_path and return its path. Pure PIL/file work, so it is safe to run
+    off the Tk main thread.
+    """
+    thumb_path = image_path.with_suffix('.thumb.png')
+    if thumb_path.exists() and thumb_path.stat().st_mtime >= image_path.stat().st_mtime:
+        return thumb_path
+    
+    # Drop alpha once here instead of compositing on every blit
+    img = Image.open(image_path).convert('RGB')
+    
+    # Only shrinks, never enlarges; keeps aspect ratio
+    img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+    img.save(thumb_path)
+    return thumb_path
+
+
+def load_scaled_photo(image_path, pending=None):
+    """
+    Load the scaled version of an image as a PhotoImage (Tk main thread only).
+    
+    pending is an optional future from prepare_thumbnail submitted earlier;
+    the PhotoImage is memoized for this process.
+    """
+    key = (image_path, image_path.stat().st_mtime)
+    if key in _IMG_CACHE:
+        return _IMG_CACHE[key]
+    
+    thumb_path = pending.result() if pending else prepare_thumbnail(image_path)
+    photo = tk.PhotoImage(file=str(thumb_path))
+    
+    _IMG_CACHE[key] = photo
+    return photo
+
 
 class NYCDashboard:
     """
@@ -57,6 +101,11 @@ class NYCDashboard:
         self.notebook = ttk.Notebook(root, style='Custom.TNotebook')
         self.notebook.pack(fill='both', expand=True, padx=15, pady=10)
         
+        # Image tabs are built on first selection; see _on_tab_changed
+        self._builders = {}
+        self._pending_images = {}
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        
         # Create tabs
         self.create_overview_tab()
         self.create_time_series_tab()
@@ -151,20 +200,21 @@ class NYCDashboard:
             zone_file = AGGREGATED_DIR / "trips_by_zone_category.parquet"
             
             if zone_file.exists():
-                stats = con.execute(f"""
+                cur = con.execute(f"""
                     SELECT 
-                        SUM(trip_count) as total_trips,
-                        SUM(total_congestion_collected) as total_revenue,
-                        SUM(trips_with_surcharge) as trips_with,
-                        SUM(trips_without_surcharge) as trips_without
+                        COALESCE(SUM(trip_count), 0) as total_trips,
+                        COALESCE(SUM(total_congestion_collected), 0) as total_revenue,
+                        COALESCE(SUM(trips_with_surcharge), 0) as trips_with,
+                        COALESCE(SUM(trips_without_surcharge), 0) as trips_without
                     FROM read_parquet('{zone_file}')
                     WHERE after_congestion_start = 1
-                """).fetchone()
+                """)
+                stats = dict(zip([d[0] for d in cur.description], cur.fetchone()))
                 
-                total_trips = stats[0] if stats[0] else 0
-                total_revenue = stats[1] if stats[1] else 0
-                trips_with = stats[2] if stats[2] else 0
-                trips_without = stats[3] if stats[3] else 0
+                total_trips = stats['total_trips']
+                total_revenue = stats['total_revenue']
+                trips_with = stats['trips_with']
+                trips_without = stats['trips_without']
                 
                 compliance_rate = (trips_with / (trips_with + trips_without) * 100) if (trips_with + trips_without) > 0 else 0
                 leakage_rate = 100 - compliance_rate
@@ -222,14 +272,17 @@ class NYCDashboard:
     
     def create_enhanced_metric_card(self, parent, title, value, color, row, col):
         """Create an enhanced metric card with color"""
-        card = tk.Frame(parent, bg=color, relief='raised', borderwidth=0)
+        # Border highlight stands in for a drop shadow (no extra widget or place())
+        card = tk.Frame(
+            parent,
+            bg=color,
+            relief='raised',
+            bd=0,
+            highlightbackground='#bdc3c7',
+            highlightthickness=3
+        )
         card.grid(row=row, column=col, padx=15, pady=15, sticky='nsew', ipadx=20, ipady=20)
         
-        # Add shadow effect with another frame
-        shadow = tk.Frame(card, bg='#bdc3c7', relief='flat')
-        shadow.place(x=5, y=5, relwidth=1, relheight=1)
-        shadow.lower()
-        
         title_label = tk.Label(
             card, 
             text=title, 
@@ -253,44 +306,42 @@ class NYCDashboard:
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="📈 Time Series")
         
-        self.display_image_scrollable(
-            tab, 
-            FIGURES_DIR / "time_series_trips.png", 
-            "Daily Trip Volume Over Time"
-        )
+        self.add_image_tab(tab, FIGURES_DIR / "time_series_trips.png", "Daily Trip Volume Over Time")
     
     def create_revenue_tab(self):
         """Create revenue visualization tab"""
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="💰 Revenue")
         
-        self.display_image_scrollable(
-            tab, 
-            FIGURES_DIR / "revenue_analysis.png", 
-            "Congestion Toll Revenue Analysis"
-        )
+        self.add_image_tab(tab, FIGURES_DIR / "revenue_analysis.png", "Congestion Toll Revenue Analysis")
     
     def create_zone_tab(self):
         """Create zone distribution visualization tab"""
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="📍 Zones")
         
-        self.display_image_scrollable(
-            tab, 
-            FIGURES_DIR / "zone_category_distribution.png", 
-            "Trip Distribution by Zone Category"
-        )
+        self.add_image_tab(tab, FIGURES_DIR / "zone_category_distribution.png", "Trip Distribution by Zone Category")
     
     def create_leakage_tab(self):
         """Create leakage analysis visualization tab"""
         tab = ttk.Frame(self.notebook)
         self.notebook.add(tab, text="🔍 Leakage")
         
-        self.display_image_scrollable(
-            tab, 
-            FIGURES_DIR / "leakage_analysis.png", 
-            "Congestion Toll Leakage Analysis"
-        )
+        self.add_image_tab(tab, FIGURES_DIR / "leakage_analysis.png", "Congestion Toll Leakage Analysis")
+    
+    def add_image_tab(self, tab, image_path, title):
+        """Start decoding the tab's image in the background and defer building the tab"""
+        if image_path.exists():
+            self._pending_images[image_path] = _IMG_POOL.submit(prepare_thumbnail, image_path)
+        
+        self._builders[str(tab)] = (self.display_image_scrollable, (tab, image_path, title))
+    
+    def _on_tab_changed(self, event):
+        """Build a tab's contents the first time it is selected"""
+        builder = self._builders.pop(self.notebook.select(), None)
+        if builder:
+            build_fn, args = builder
+            build_fn(*args)
     
     def display_image_scrollable(self, parent, image_path, title):
         """Display an image in a scrollable canvas with proper fitting"""
@@ -314,33 +365,8 @@ class NYCDashboard:
         
         try:
             if image_path.exists():
-                # Load image
-                img = Image.open(image_path)
-                
-                # Use fixed dimensions for scaling (safe defaults)
-                max_width = 1200
-                max_height = 650
-                
-                # Calculate scaling to fit while maintaining aspect ratio
-                img_width, img_height = img.size
-                
-                # Only resize if image is larger than max dimensions
-                if img_width > max_width or img_height > max_height:
-                    width_ratio = max_width / img_width
-                    height_ratio = max_height / img_height
-                    scale_ratio = min(width_ratio, height_ratio)
-                    
-                    new_width = int(img_width * scale_ratio)
-                    new_height = int(img_height * scale_ratio)
-                    
-                    # Resize image
-                    img_resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                else:
-                    # Use original size if smaller
-                    img_resized = img
-                
-                # Convert to PhotoImage
-                photo = ImageTk.PhotoImage(img_resized)
+                # Load (cached) scaled image
+                photo = load_scaled_photo(image_path, self._pending_images.pop(image_path, None))
                 
                 # Create canvas with scrollbars
                 canvas_frame = tk.Frame(container, bg='white')
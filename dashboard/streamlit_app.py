@@ -16,11 +16,9 @@ Usage:
 """
 
 import streamlit as st
-import pandas as pd
 import duckdb
 from pathlib import Path
 import sys
-from PIL import Image
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
@@ -69,87 +67,132 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+ZONE_FILE = AGGREGATED_DIR / "trips_by_zone_category.parquet"
+SUMMARY_FILE = AGGREGATED_DIR / "dashboard_summary.parquet"
+
+
+@st.cache_resource
+def get_con():
+    """Shared DuckDB connection with the zone parquet registered as a view"""
+    con = duckdb.connect()
+    # Keep parquet metadata cached across reruns (local file, so no httpfs cache needed)
+    con.execute("PRAGMA enable_object_cache")
+    con.execute(f"CREATE VIEW zones AS SELECT * FROM read_parquet('{ZONE_FILE}')")
+    return con
+
+
 @st.cache_data
-def load_statistics():
-    """Load aggregated statistics from parquet files"""
+def load_all(mtime):
+    """
+    Load KPI statistics and zone category data from a single aggregation pass.
+    
+    mtime is the newest modification time of the source parquets; it only
+    serves as the cache key so reruns reuse the result until a file is rewritten.
+    """
     try:
-        con = duckdb.connect()
-        zone_file = AGGREGATED_DIR / "trips_by_zone_category.parquet"
-        
-        if zone_file.exists():
-            stats = con.execute(f"""
-                SELECT 
-                    SUM(trip_count) as total_trips,
-                    SUM(total_congestion_collected) as total_revenue,
-                    SUM(trips_with_surcharge) as trips_with_surcharge,
-                    SUM(trips_without_surcharge) as trips_without_surcharge,
-                    AVG(avg_fare) as avg_fare,
-                    AVG(avg_distance) as avg_distance
-                FROM read_parquet('{zone_file}')
-                WHERE after_congestion_start = 1
-            """).fetchone()
+        if ZONE_FILE.exists():
+            if SUMMARY_FILE.exists():
+                # Rollup precomputed by the pipeline (Phase 5)
+                groups_sql = f"SELECT * FROM read_parquet('{SUMMARY_FILE}')"
+            else:
+                groups_sql = """
+                    SELECT 
+                        zone_category,
+                        after_congestion_start,
+                        SUM(trip_count) as trips,
+                        SUM(total_congestion_collected) as revenue,
+                        SUM(trips_with_surcharge) as trips_with_surcharge,
+                        SUM(trips_without_surcharge) as trips_without_surcharge,
+                        SUM(avg_fare) as fare_sum,
+                        COUNT(avg_fare) as fare_count,
+                        SUM(avg_distance) as distance_sum,
+                        COUNT(avg_distance) as distance_count
+                    FROM zones
+                    GROUP BY zone_category, after_congestion_start
+                """
             
-            total_trips = stats[0] if stats[0] else 0
-            total_revenue = stats[1] if stats[1] else 0
-            trips_with = stats[2] if stats[2] else 0
-            trips_without = stats[3] if stats[3] else 0
-            avg_fare = stats[4] if stats[4] else 0
-            avg_distance = stats[5] if stats[5] else 0
+            # Zone groups plus the post-implementation KPIs (repeated per row) in one pass
+            groups = get_con().execute(f"""
+                WITH groups AS ({groups_sql}),
+                kpis AS (
+                    SELECT 
+                        COALESCE(SUM(trips), 0) as total_trips,
+                        COALESCE(SUM(revenue), 0) as total_revenue,
+                        COALESCE(SUM(trips_with_surcharge), 0) as kpi_trips_with_surcharge,
+                        COALESCE(SUM(trips_without_surcharge), 0) as kpi_trips_without_surcharge,
+                        COALESCE(SUM(trips_with_surcharge) * 100.0
+                            / NULLIF(SUM(trips_with_surcharge) + SUM(trips_without_surcharge), 0), 0) as compliance_rate,
+                        100 - COALESCE(SUM(trips_with_surcharge) * 100.0
+                            / NULLIF(SUM(trips_with_surcharge) + SUM(trips_without_surcharge), 0), 0) as leakage_rate,
+                        COALESCE(SUM(fare_sum) / NULLIF(SUM(fare_count), 0), 0) as avg_fare,
+                        COALESCE(SUM(distance_sum) / NULLIF(SUM(distance_count), 0), 0) as avg_distance,
+                        COALESCE(SUM(trips_without_surcharge), 0) * 2.5 as estimated_lost_revenue
+                    FROM groups
+                    WHERE after_congestion_start = 1
+                )
+                SELECT groups.*, kpis.*
+                FROM groups CROSS JOIN kpis
+                ORDER BY zone_category, after_congestion_start
+            """).arrow()
             
-            compliance_rate = (trips_with / (trips_with + trips_without) * 100) if (trips_with + trips_without) > 0 else 0
-            leakage_rate = 100 - compliance_rate
-            estimated_lost = trips_without * 2.5
+            if groups.num_rows == 0:
+                return None, None
             
-            return {
-                'total_trips': total_trips,
-                'total_revenue': total_revenue,
-                'trips_with_surcharge': trips_with,
-                'trips_without_surcharge': trips_without,
-                'compliance_rate': compliance_rate,
-                'leakage_rate': leakage_rate,
-                'avg_fare': avg_fare,
-                'avg_distance': avg_distance,
-                'estimated_lost_revenue': estimated_lost
+            kpi = groups.slice(0, 1).to_pylist()[0]
+            stats = {
+                'total_trips': kpi['total_trips'],
+                'total_revenue': kpi['total_revenue'],
+                'trips_with_surcharge': kpi['kpi_trips_with_surcharge'],
+                'trips_without_surcharge': kpi['kpi_trips_without_surcharge'],
+                'compliance_rate': kpi['compliance_rate'],
+                'leakage_rate': kpi['leakage_rate'],
+                'avg_fare': kpi['avg_fare'],
+                'avg_distance': kpi['avg_distance'],
+                'estimated_lost_revenue': kpi['estimated_lost_revenue']
             }
-        
-        con.close()
+            
+            # Pivot trips by period in the engine; a cursor keeps the registration private
+            cur = get_con().cursor()
+            cur.register('zone_groups', groups)
+            zone_data = cur.execute("""
+                SELECT 
+                    zone_category,
+                    COALESCE("After Jan 5", 0) as "After Jan 5",
+                    COALESCE("Before Jan 5", 0) as "Before Jan 5"
+                FROM (
+                    PIVOT (
+                        SELECT 
+                            zone_category,
+                            CASE after_congestion_start WHEN 1 THEN 'After Jan 5' ELSE 'Before Jan 5' END as Period,
+                            trips
+                        FROM zone_groups
+                    )
+                    ON Period IN ('After Jan 5', 'Before Jan 5')
+                    USING SUM(trips)
+                    GROUP BY zone_category
+                )
+                ORDER BY zone_category
+            """).arrow()
+            cur.close()
+            
+            return stats, zone_data
         
     except Exception as e:
         st.error(f"Error loading statistics: {e}")
-        return None
+        return None, None
     
-    return None
+    return None, None
 
 
-@st.cache_data
-def load_zone_data():
-    """Load zone category data"""
-    try:
-        con = duckdb.connect()
-        zone_file = AGGREGATED_DIR / "trips_by_zone_category.parquet"
-        
-        if zone_file.exists():
-            df = con.execute(f"""
-                SELECT 
-                    zone_category,
-                    after_congestion_start,
-                    SUM(trip_count) as trips,
-                    SUM(total_congestion_collected) as revenue
-                FROM read_parquet('{zone_file}')
-                GROUP BY zone_category, after_congestion_start
-                ORDER BY zone_category, after_congestion_start
-            """).df()
-            
-            con.close()
-            return df
-        
-        con.close()
-        
-    except Exception as e:
-        st.error(f"Error loading zone data: {e}")
-        return None
+@st.cache_resource
+def load_png(path, mtime):
+    """
+    Read a figure's PNG bytes once and keep them across reruns.
     
-    return None
+    mtime is only part of the cache key, so a regenerated figure is re-read.
+    The encoded bytes go straight to the browser without a PIL decode.
+    """
+    return Path(path).read_bytes()
 
 
 def main():
@@ -185,7 +228,8 @@ def main():
         st.markdown("- Streamlit (Dashboard)")
     
     # Load data
-    stats = load_statistics()
+    mtime = max((f.stat().st_mtime for f in (ZONE_FILE, SUMMARY_FILE) if f.exists()), default=0)
+    stats, zone_data = load_all(mtime)
     
     # Create tabs
     tab1, tab2, tab3, tab4 = st.tabs(["📊 Overview", "📈 Time Series", "💰 Revenue", "📍 Zones"])
@@ -290,8 +334,7 @@ def main():
         
         img_path = FIGURES_DIR / "time_series_trips.png"
         if img_path.exists():
-            image = Image.open(img_path)
-            st.image(image, use_container_width=True)
+            st.image(load_png(str(img_path), img_path.stat().st_mtime), use_container_width=True)
             
             st.markdown("---")
             st.markdown("#### Analysis")
@@ -311,8 +354,7 @@ def main():
         
         img_path = FIGURES_DIR / "revenue_analysis.png"
         if img_path.exists():
-            image = Image.open(img_path)
-            st.image(image, use_container_width=True)
+            st.image(load_png(str(img_path), img_path.stat().st_mtime), use_container_width=True)
             
             st.markdown("---")
             
@@ -342,30 +384,15 @@ def main():
         
         img_path = FIGURES_DIR / "zone_category_distribution.png"
         if img_path.exists():
-            image = Image.open(img_path)
-            st.image(image, use_container_width=True)
+            st.image(load_png(str(img_path), img_path.stat().st_mtime), use_container_width=True)
             
             st.markdown("---")
             
-            # Load zone data table
-            zone_data = load_zone_data()
+            # Zone data table
             if zone_data is not None:
                 st.subheader("📊 Zone Category Statistics")
                 
-                # Format the dataframe
-                zone_data['Period'] = zone_data['after_congestion_start'].map({
-                    0: 'Before Jan 5',
-                    1: 'After Jan 5'
-                })
-                
-                pivot_table = zone_data.pivot_table(
-                    index='zone_category',
-                    columns='Period',
-                    values='trips',
-                    fill_value=0
-                )
-                
-                st.dataframe(pivot_table, use_container_width=True)
+                st.dataframe(zone_data, use_container_width=True, hide_index=True)
                 
                 st.markdown("#### Zone Categories Explained")
                 st.markdown("""
@@ -2,7 +2,8 @@
 NYC Congestion Pricing Audit - Main Pipeline
 =============================================
 
-This is the main orchestrator that runs all phases in sequence.
+This is the main orchestrator that runs all phases in dependency order
+(see PHASES); phases that don't depend on each other run concurrently.
 
 Usage:
     python pipeline.py              # Run all phases
@@ -27,6 +28,8 @@ Output:
 
 import sys
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from graphlib import TopologicalSorter
 from pathlib import Path
 from loguru import logger
 from datetime import datetime
@@ -41,12 +44,13 @@ from src import zones
 from src import analysis
 from src import visualization
 from src import weather
+from src.cache import cached_phase
 
-# Setup logging
+# Log file for this run (sinks are installed in main())
 LOG_FILE = config.LOGS_DIR / f"pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-logger.remove()
-logger.add(sys.stderr, format="{time:HH:mm:ss} | {level: <8} | {message}", level="INFO")
-logger.add(LOG_FILE, format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}")
+
+
+SRC_DIR = Path(__file__).parent / "src"
 
 
 def run_phase_1():
@@ -57,7 +61,7 @@ def run_phase_1():
     
     stats = ingestion.download_all_data(skip_existing=True)
     
-    total_failed = stats['yellow_failed'] + stats['green_failed']
+    total_failed = stats['yellow_failed'] + stats['green_failed'] + stats['taxi_zones_failed']
     if total_failed > 0:
         logger.warning(f"Phase 1 completed with {total_failed} failures")
         return False
@@ -66,13 +70,34 @@ def run_phase_1():
     return True
 
 
+@cached_phase(
+    "phase_2",
+    inputs=lambda: [
+        *config.YELLOW_RAW_DIR.glob("*.parquet"),
+        *config.GREEN_RAW_DIR.glob("*.parquet"),
+        SRC_DIR / "schema.py",
+    ],
+    params={
+        'unified_schema': config.UNIFIED_SCHEMA,
+        'yellow_map': config.YELLOW_COLUMN_MAP,
+        'green_map': config.GREEN_COLUMN_MAP,
+    },
+    outputs=lambda: [
+        config.UNIFIED_DIR / f"{color}_unified_{path.name}"
+        for color, raw_dir in (('yellow', config.YELLOW_RAW_DIR), ('green', config.GREEN_RAW_DIR))
+        for path in raw_dir.glob("*.parquet")
+    ],
+)
 def run_phase_2():
     """Phase 2: Schema Unification"""
     logger.info("\n" + "=" * 80)
     logger.info("PHASE 2: Schema Unification")
     logger.info("=" * 80)
     
-    stats = schema.unify_all_files()
+    # Only reached on a cache miss, i.e. the raw files, schema.py or the
+    # column maps changed, so existing unified files are stale and every
+    # file is unified again rather than skipped
+    stats = schema.unify_all_files(skip_existing=False)
     
     total_failed = stats['yellow_failed'] + stats['green_failed']
     if total_failed > 0:
@@ -83,13 +108,31 @@ def run_phase_2():
     return True
 
 
+@cached_phase(
+    "phase_3",
+    inputs=lambda: [*config.UNIFIED_DIR.glob("*unified*.parquet"), SRC_DIR / "cleaning.py"],
+    params={
+        'max_speed_mph': config.MAX_SPEED_MPH,
+        'min_trip_duration_seconds': config.MIN_TRIP_DURATION_SECONDS,
+        'high_fare_threshold': config.HIGH_FARE_THRESHOLD,
+        'min_distance_miles': config.MIN_DISTANCE_MILES,
+    },
+    outputs=lambda: [
+        output_dir / path.name.replace('unified', kind)
+        for path in config.UNIFIED_DIR.glob("*_unified_*.parquet")
+        for output_dir, kind in ((config.UNIFIED_DIR, 'clean'), (config.GHOST_TRIPS_DIR, 'ghost'))
+    ],
+)
 def run_phase_3():
     """Phase 3: Ghost Trip Detection"""
     logger.info("\n" + "=" * 80)
     logger.info("PHASE 3: Ghost Trip Detection")
     logger.info("=" * 80)
     
-    stats = cleaning.clean_all_files()
+    # Only reached on a cache miss, i.e. the unified files, cleaning.py or
+    # the ghost thresholds changed, so existing clean files are stale and
+    # everything is re-cleaned rather than skipped
+    stats = cleaning.clean_all_files(skip_existing=False)
     
     if stats['files_processed'] == 0:
         logger.error("Phase 3 failed - no files processed")
@@ -101,6 +144,19 @@ def run_phase_3():
     return True
 
 
+@cached_phase(
+    "phase_4",
+    inputs=lambda: [*config.UNIFIED_DIR.glob("*-12*.parquet"), SRC_DIR / "imputation.py"],
+    params={
+        'dec_2023_weight': config.DEC_2023_WEIGHT,
+        'dec_2024_weight': config.DEC_2024_WEIGHT,
+    },
+    # Imputed files are only written when December 2025 is missing
+    outputs=lambda: [] if imputation.check_december_2025_exists() else [
+        config.UNIFIED_DIR / f"{taxi_type}_imputed_dec2025_daily_stats.parquet"
+        for taxi_type in ('yellow', 'green')
+    ],
+)
 def run_phase_4():
     """Phase 4: Missing Data Imputation"""
     logger.info("\n" + "=" * 80)
@@ -113,6 +169,22 @@ def run_phase_4():
     return True
 
 
+@cached_phase(
+    "phase_5",
+    inputs=lambda: [
+        *config.UNIFIED_DIR.glob("*clean*.parquet"),
+        *config.TAXI_ZONES_DIR.glob("taxi_zones.*"),
+        SRC_DIR / "zones.py",
+    ],
+    params={'congestion_start_date': config.CONGESTION_START_DATE},
+    outputs=lambda: [
+        config.AGGREGATED_DIR / "trips_by_zone_category.parquet",
+        config.AGGREGATED_DIR / "audit_stats.parquet",
+        config.AGGREGATED_DIR / "daily_summary.parquet",
+        config.AGGREGATED_DIR / "dashboard_summary.parquet",
+        config.AGGREGATED_DIR / "top_pickup_locations_entering_zone.parquet",
+    ],
+)
 def run_phase_5():
     """Phase 5: Congestion Zone Filtering"""
     logger.info("\n" + "=" * 80)
@@ -134,13 +206,33 @@ def run_phase_5():
         return False
     
     # Classify trips
-    zones.classify_trips_by_zone(congestion_zone_ids)
-    zones.analyze_zone_patterns()
+    if not zones.classify_trips_by_zone(congestion_zone_ids):
+        logger.error("Phase 5 failed - could not classify trips")
+        return False
+    
+    if not zones.analyze_zone_patterns(congestion_zone_ids):
+        logger.error("Phase 5 failed - could not analyze zone patterns")
+        return False
     
     logger.success("Phase 5 completed successfully!")
     return True
 
 
+@cached_phase(
+    "phase_6_7",
+    inputs=lambda: [
+        config.AGGREGATED_DIR / "trips_by_zone_category.parquet",
+        *config.UNIFIED_DIR.glob("*clean*.parquet"),
+        SRC_DIR / "analysis.py",
+    ],
+    params={
+        'congestion_surcharge': config.CONGESTION_SURCHARGE,
+    },
+    outputs=lambda: [
+        config.AGGREGATED_DIR / "leakage_summary.parquet",
+        config.AGGREGATED_DIR / "yellow_vs_green_q1_comparison.parquet",
+    ],
+)
 def run_phase_6_7():
     """Phase 6-7: Analysis (Leakage + Yellow vs Green)"""
     logger.info("\n" + "=" * 80)
@@ -161,33 +253,81 @@ def run_phase_6_7():
     return True
 
 
+@cached_phase(
+    "phase_8",
+    inputs=lambda: [
+        config.AGGREGATED_DIR / "daily_summary.parquet",
+        config.AGGREGATED_DIR / "dashboard_summary.parquet",
+        SRC_DIR / "visualization.py",
+    ],
+    outputs=lambda: [
+        config.FIGURES_DIR / name for name in (
+            "time_series_trips.png", "revenue_analysis.png",
+            "zone_category_distribution.png", "leakage_analysis.png",
+        )
+    ],
+)
 def run_phase_8():
     """Phase 8: Visualization"""
     logger.info("\n" + "=" * 80)
     logger.info("PHASE 8: Visualization")
     logger.info("=" * 80)
     
-    visualization.create_all_visualizations()
+    if not visualization.create_all_visualizations():
+        logger.error("Phase 8 failed - some charts were not created")
+        return False
     
     logger.success("Phase 8 completed successfully!")
     return True
 
 
+@cached_phase(
+    "phase_9",
+    inputs=lambda: [
+        config.AGGREGATED_DIR / "trips_by_zone_category.parquet",
+        SRC_DIR / "weather.py",
+    ],
+    params={
+        'weather_start_date': config.WEATHER_START_DATE,
+        'weather_end_date': config.WEATHER_END_DATE,
+    },
+    outputs=lambda: [config.AGGREGATED_DIR / "weather_joined.parquet"],
+)
 def run_phase_9():
     """Phase 9: Weather Integration"""
     logger.info("\n" + "=" * 80)
     logger.info("PHASE 9: Weather Integration")
     logger.info("=" * 80)
     
-    weather.join_weather_with_trips()
+    if not weather.join_weather_with_trips():
+        logger.error("Phase 9 failed - could not join weather data")
+        return False
     
     logger.success("Phase 9 completed successfully!")
     return True
 
 
+# Phase name -> (runner, phases whose outputs it reads)
+PHASES = {
+    'phase_1': (run_phase_1, []),
+    'phase_2': (run_phase_2, ['phase_1']),
+    'phase_3': (run_phase_3, ['phase_2']),
+    'phase_4': (run_phase_4, ['phase_3']),
+    'phase_5': (run_phase_5, ['phase_3']),
+    'phase_6_7': (run_phase_6_7, ['phase_5']),
+    'phase_8': (run_phase_8, ['phase_6_7']),
+    'phase_9': (run_phase_9, ['phase_6_7']),
+}
+
+
+def _phase_label(name):
+    """'phase_6_7' -> 'Phase 6-7'"""
+    return name.replace('phase_', 'Phase ').replace('_', '-')
+
+
 def run_all_phases(skip_download=False):
     """
-    Run all phases in sequence.
+    Run all phases in dependency order.
     
     Args:
         skip_download: If True, skip Phase 1 (data download)
@@ -207,60 +347,37 @@ def run_all_phases(skip_download=False):
     results = {}
     
     # Phase 1: Data Ingestion
-    if not skip_download:
-        results['phase_1'] = run_phase_1()
-    else:
+    if skip_download:
         logger.info("Skipping Phase 1 (data download)")
         results['phase_1'] = True
     
-    # Phase 2: Schema Unification
-    if results['phase_1']:
-        results['phase_2'] = run_phase_2()
-    else:
-        logger.error("Skipping Phase 2 due to Phase 1 failure")
-        results['phase_2'] = False
-    
-    # Phase 3: Ghost Trip Detection
-    if results['phase_2']:
-        results['phase_3'] = run_phase_3()
-    else:
-        logger.error("Skipping Phase 3 due to Phase 2 failure")
-        results['phase_3'] = False
-    
-    # Phase 4: Missing Data Imputation
-    if results['phase_3']:
-        results['phase_4'] = run_phase_4()
-    else:
-        logger.error("Skipping Phase 4 due to Phase 3 failure")
-        results['phase_4'] = False
-    
-    # Phase 5: Congestion Zone Filtering
-    if results['phase_4']:
-        results['phase_5'] = run_phase_5()
-    else:
-        logger.error("Skipping Phase 5 due to Phase 4 failure")
-        results['phase_5'] = False
-    
-    # Phase 6-7: Analysis
-    if results['phase_5']:
-        results['phase_6_7'] = run_phase_6_7()
-    else:
-        logger.error("Skipping Phase 6-7 due to Phase 5 failure")
-        results['phase_6_7'] = False
-    
-    # Phase 8: Visualization
-    if results['phase_6_7']:
-        results['phase_8'] = run_phase_8()
-    else:
-        logger.error("Skipping Phase 8 due to Phase 6-7 failure")
-        results['phase_8'] = False
-    
-    # Phase 9: Weather Integration
-    if results['phase_8']:
-        results['phase_9'] = run_phase_9()
-    else:
-        logger.error("Skipping Phase 9 due to Phase 8 failure")
-        results['phase_9'] = False
+    # Run phases in waves: every phase whose dependencies have finished is
+    # started together, so independent phases (4 and 5, 8 and 9) overlap
+    sorter = TopologicalSorter({name: deps for name, (_, deps) in PHASES.items()})
+    sorter.prepare()
+    
+    with ThreadPoolExecutor() as executor:
+        while sorter.is_active():
+            ready = sorter.get_ready()
+            futures = {}
+            
+            for name in ready:
+                if name in results:
+                    continue
+                
+                failed = [dep for dep in PHASES[name][1] if not results[dep]]
+                if failed:
+                    logger.error(f"Skipping {_phase_label(name)} due to {_phase_label(failed[0])} failure")
+                    results[name] = False
+                else:
+                    futures[name] = executor.submit(PHASES[name][0])
+            
+            for name, future in futures.items():
+                results[name] = future.result()
+            
+            sorter.done(*ready)
+    
+    results = {name: results[name] for name in PHASES}
     
     # Print summary
     logger.info("\n" + "=" * 80)
@@ -304,6 +421,10 @@ def main():
     
     args = parser.parse_args()
     
+    # File writes go through a background queue, so the per-file logging in
+    # the Phase 2/3 worker processes doesn't block on the log file
+    config.configure_logging(LOG_FILE, enqueue=True)
+    
     # Run specific phase or all phases
     if args.phase:
         phase_functions = {
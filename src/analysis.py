@@ -16,19 +16,39 @@ This module performs two key analyses:
 """
 
 import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 from pathlib import Path
 from loguru import logger
 import sys
 
 from .config import (
-    AGGREGATED_DIR, CONGESTION_START_DATE,
-    Q1_2024_MONTHS, Q1_2025_MONTHS, LOGS_DIR
+    AGGREGATED_DIR, MANIFEST_FILE, CONGESTION_START_DATE, CONGESTION_SURCHARGE,
+    Q1_2024_MONTHS, Q1_2025_MONTHS, LOGS_DIR,
+    configure_logging, connect
 )
+from .schema import manifest_files
 
-# Setup logging
-logger.remove()
-logger.add(sys.stderr, format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}")
-logger.add(LOGS_DIR / "analysis.log", rotation="10 MB")
+# One connection shared by both analyses, so Parquet metadata cached while
+# computing leakage is still warm for the Yellow vs Green comparison. It is
+# opened on first use, not at import, so importing this module (as
+# pipeline.py does before forking its worker pools) doesn't start DuckDB
+_CON = None
+
+
+def _get_con() -> duckdb.DuckDBPyConnection:
+    """
+    Return this module's DuckDB connection, creating it on first use.
+    """
+    
+    global _CON
+    
+    if _CON is None:
+        _CON = connect()
+    
+    return _CON
 
 
 def analyze_leakage_and_compliance() -> dict:
@@ -56,8 +76,6 @@ def analyze_leakage_and_compliance() -> dict:
         logger.info("Analyzing Leakage & Compliance")
         logger.info("=" * 60)
         
-        con = duckdb.connect()
-        
         # Load zone classification data
         zone_file = AGGREGATED_DIR / "trips_by_zone_category.parquet"
         
@@ -65,57 +83,41 @@ def analyze_leakage_and_compliance() -> dict:
             logger.error("Zone classification file not found. Run zones.py first.")
             return {}
         
-        # Calculate overall leakage
-        leakage_query = f"""
-        SELECT 
-            SUM(trip_count) as total_trips,
-            SUM(trips_with_surcharge) as trips_with_surcharge,
-            SUM(trips_without_surcharge) as trips_without_surcharge,
-            ROUND(100.0 * SUM(trips_without_surcharge) / SUM(trip_count), 2) as leakage_pct,
-            SUM(total_congestion_collected) as total_revenue_collected,
-            SUM(trips_without_surcharge) * 9.0 as estimated_revenue_lost
-        FROM read_parquet('{zone_file}')
-        WHERE after_congestion_start = 1
-          AND zone_category IN ('entering_zone', 'exiting_zone')
-        """
+        # Calculate overall leakage. This is a filtered SUM over a small
+        # aggregate file, so Arrow compute with row-group filter pushdown is
+        # enough; DuckDB is kept for the larger comparison scan below.
+        zone_trips = ds.dataset(zone_file).to_table(
+            columns=['trip_count', 'trips_with_surcharge', 'trips_without_surcharge', 'total_congestion_collected'],
+            filter=(ds.field('after_congestion_start') == 1)
+                   & ds.field('zone_category').isin(['entering_zone', 'exiting_zone'])
+        )
         
-        result = con.execute(leakage_query).fetchone()
+        total_trips = pc.sum(zone_trips['trip_count']).as_py()
+        trips_without_surcharge = pc.sum(zone_trips['trips_without_surcharge']).as_py()
         
         stats = {
-            'total_trips': result[0],
-            'trips_with_surcharge': result[1],
-            'trips_without_surcharge': result[2],
-            'leakage_pct': result[3],
-            'total_revenue_collected': result[4],
-            'estimated_revenue_lost': result[5]
+            'total_trips': total_trips,
+            'trips_with_surcharge': pc.sum(zone_trips['trips_with_surcharge']).as_py(),
+            'trips_without_surcharge': trips_without_surcharge,
+            'leakage_pct': round(100.0 * trips_without_surcharge / total_trips, 2) if total_trips else None,
+            'total_revenue_collected': pc.sum(zone_trips['total_congestion_collected']).as_py(),
+            'estimated_revenue_lost': trips_without_surcharge * CONGESTION_SURCHARGE if trips_without_surcharge is not None else None
         }
         
         logger.info(f"\nOverall Leakage Analysis:")
-        logger.info(f"  Total cross-border trips: {stats['total_trips']:,}")
-        logger.info(f"  Trips with surcharge: {stats['trips_with_surcharge']:,}")
-        logger.info(f"  Trips without surcharge (LEAKAGE): {stats['trips_without_surcharge']:,}")
-        logger.info(f"  Leakage rate: {stats['leakage_pct']:.2f}%")
-        logger.info(f"  Revenue collected: ${stats['total_revenue_collected']:,.2f}")
-        logger.info(f"  Estimated revenue lost: ${stats['estimated_revenue_lost']:,.2f}")
+        logger.opt(lazy=True).info("{}", lambda: f"  Total cross-border trips: {stats['total_trips']:,}")
+        logger.opt(lazy=True).info("{}", lambda: f"  Trips with surcharge: {stats['trips_with_surcharge']:,}")
+        logger.opt(lazy=True).info("{}", lambda: f"  Trips without surcharge (LEAKAGE): {stats['trips_without_surcharge']:,}")
+        logger.opt(lazy=True).info("{}", lambda: f"  Leakage rate: {stats['leakage_pct']:.2f}%")
+        logger.opt(lazy=True).info("{}", lambda: f"  Revenue collected: ${stats['total_revenue_collected']:,.2f}")
+        logger.opt(lazy=True).info("{}", lambda: f"  Estimated revenue lost: ${stats['estimated_revenue_lost']:,.2f}")
         
         # Save leakage summary
         summary_path = AGGREGATED_DIR / "leakage_summary.parquet"
-        con.execute(f"""
-        COPY (
-            SELECT 
-                '{stats['total_trips']}' as total_trips,
-                '{stats['trips_with_surcharge']}' as trips_with_surcharge,
-                '{stats['trips_without_surcharge']}' as trips_without_surcharge,
-                '{stats['leakage_pct']}' as leakage_pct,
-                '{stats['total_revenue_collected']}' as total_revenue_collected,
-                '{stats['estimated_revenue_lost']}' as estimated_revenue_lost
-        )
-        TO '{summary_path}' (FORMAT PARQUET)
-        """)
+        pq.write_table(pa.Table.from_pylist([stats]), str(summary_path), compression='zstd', compression_level=3)
         
         logger.success(f"Saved leakage summary to {summary_path}")
         
-        con.close()
         return stats
         
     except Exception as e:
@@ -148,98 +150,93 @@ def compare_yellow_vs_green() -> dict:
         logger.info("Comparing Yellow vs Green Taxis (Q1 2024 vs Q1 2025)")
         logger.info("=" * 60)
         
-        con = duckdb.connect()
+        con = _get_con()
         
-        # Q1 2024 statistics
-        q1_2024_query = f"""
-        SELECT 
-            CASE 
-                WHEN source_file LIKE '%yellow%' THEN 'Yellow'
-                ELSE 'Green'
-            END as taxi_type,
-            COUNT(*) as trip_count,
-            AVG(fare) as avg_fare,
-            AVG(total_amount) as avg_total,
-            SUM(total_amount) as total_revenue
-        FROM (
-            SELECT *, current_filename() as source_file
-            FROM read_parquet('{AGGREGATED_DIR.parent}/processed/unified/*clean*2024-0[1-3]*.parquet')
-        )
-        GROUP BY taxi_type
-        """
+        # Q1 2024 + Q1 2025 statistics per taxi type. The file lists come
+        # from the Phase 3 manifest, so taxi type and year are constants
+        # attached to each scan instead of being parsed from filenames.
+        if not MANIFEST_FILE.exists():
+            logger.error("File manifest not found. Run cleaning.py first.")
+            return {}
         
-        q1_2024_results = con.execute(q1_2024_query).fetchall()
+        per_year_tables = []
         
-        # Q1 2025 statistics
-        q1_2025_query = f"""
-        SELECT 
-            CASE 
-                WHEN source_file LIKE '%yellow%' THEN 'Yellow'
-                ELSE 'Green'
-            END as taxi_type,
-            COUNT(*) as trip_count,
-            AVG(fare) as avg_fare,
-            AVG(total_amount) as avg_total,
-            SUM(total_amount) as total_revenue
-        FROM (
-            SELECT *, current_filename() as source_file
-            FROM read_parquet('{AGGREGATED_DIR.parent}/processed/unified/*clean*2025-0[1-3]*.parquet')
+        for year, months in [(2024, Q1_2024_MONTHS), (2025, Q1_2025_MONTHS)]:
+            for color in ['yellow', 'green']:
+                files = manifest_files('clean', taxi_type=color, year=year, months=months)
+                
+                if not files:
+                    continue
+                
+                per_year_tables.append(
+                    con.read_parquet(files).aggregate(f"""
+                        '{color.capitalize()}' as taxi_type,
+                        {year} as year,
+                        COUNT(*) as trip_count,
+                        AVG(fare) as avg_fare,
+                        SUM(total_amount) as total_revenue
+                    """).arrow()
+                )
+        
+        if not per_year_tables:
+            logger.error("No Q1 clean files found. Run cleaning.py first.")
+            return {}
+        
+        per_year = con.from_arrow(pa.concat_tables(per_year_tables))
+        
+        comparison_query = """
+        WITH quarters AS (
+            SELECT 
+                taxi_type,
+                MAX(trip_count) FILTER (WHERE year = 2024) as trips_2024,
+                MAX(trip_count) FILTER (WHERE year = 2025) as trips_2025,
+                MAX(avg_fare) FILTER (WHERE year = 2024) as fare_2024,
+                MAX(avg_fare) FILTER (WHERE year = 2025) as fare_2025,
+                MAX(total_revenue) FILTER (WHERE year = 2024) as revenue_2024,
+                MAX(total_revenue) FILTER (WHERE year = 2025) as revenue_2025
+            FROM per_year
+            GROUP BY taxi_type
         )
-        GROUP BY taxi_type
+        SELECT 
+            taxi_type,
+            trips_2024,
+            trips_2025,
+            CASE WHEN trips_2024 > 0 THEN 100.0 * (trips_2025 - trips_2024) / trips_2024 ELSE 0 END as trip_change_pct,
+            fare_2024,
+            fare_2025,
+            CASE WHEN fare_2024 > 0 THEN 100.0 * (fare_2025 - fare_2024) / fare_2024 ELSE 0 END as fare_change_pct,
+            revenue_2024,
+            revenue_2025,
+            CASE WHEN revenue_2024 > 0 THEN 100.0 * (revenue_2025 - revenue_2024) / revenue_2024 ELSE 0 END as revenue_change_pct
+        FROM quarters
+        WHERE trips_2024 IS NOT NULL AND trips_2025 IS NOT NULL
+        ORDER BY taxi_type DESC
         """
         
-        q1_2025_results = con.execute(q1_2025_query).fetchall()
+        comparison = per_year.query('per_year', comparison_query).arrow()
         
-        # Calculate changes
+        # Log comparison
         logger.info("\nQ1 2024 vs Q1 2025 Comparison:")
         logger.info("-" * 80)
         logger.info(f"{'Taxi Type':<15} {'Period':<10} {'Trips':>15} {'Avg Fare':>12} {'Total Revenue':>18}")
         logger.info("-" * 80)
         
-        comparison_data = []
+        comparison_data = comparison.to_pylist()
         
-        for row_2024 in q1_2024_results:
-            taxi_type, trips_2024, fare_2024, total_2024, revenue_2024 = row_2024
-            logger.info(f"{taxi_type:<15} {'Q1 2024':<10} {trips_2024:>15,} ${fare_2024:>11.2f} ${revenue_2024:>17,.2f}")
-            
-            # Find matching 2025 data
-            for row_2025 in q1_2025_results:
-                if row_2025[0] == taxi_type:
-                    trips_2025, fare_2025, total_2025, revenue_2025 = row_2025[1:]
-                    logger.info(f"{taxi_type:<15} {'Q1 2025':<10} {trips_2025:>15,} ${fare_2025:>11.2f} ${revenue_2025:>17,.2f}")
-                    
-                    # Calculate changes
-                    trip_change_pct = ((trips_2025 - trips_2024) / trips_2024 * 100) if trips_2024 > 0 else 0
-                    fare_change_pct = ((fare_2025 - fare_2024) / fare_2024 * 100) if fare_2024 > 0 else 0
-                    revenue_change_pct = ((revenue_2025 - revenue_2024) / revenue_2024 * 100) if revenue_2024 > 0 else 0
-                    
-                    logger.info(f"{taxi_type:<15} {'Change':<10} {trip_change_pct:>14.1f}% {fare_change_pct:>11.1f}% {revenue_change_pct:>16.1f}%")
-                    logger.info("-" * 80)
-                    
-                    comparison_data.append({
-                        'taxi_type': taxi_type,
-                        'trips_2024': trips_2024,
-                        'trips_2025': trips_2025,
-                        'trip_change_pct': trip_change_pct,
-                        'fare_2024': fare_2024,
-                        'fare_2025': fare_2025,
-                        'fare_change_pct': fare_change_pct,
-                        'revenue_2024': revenue_2024,
-                        'revenue_2025': revenue_2025,
-                        'revenue_change_pct': revenue_change_pct
-                    })
+        for row in comparison_data:
+            taxi_type = row['taxi_type']
+            logger.opt(lazy=True).info("{}", lambda: f"{taxi_type:<15} {'Q1 2024':<10} {int(row['trips_2024']):>15,} ${row['fare_2024']:>11.2f} ${row['revenue_2024']:>17,.2f}")
+            logger.opt(lazy=True).info("{}", lambda: f"{taxi_type:<15} {'Q1 2025':<10} {int(row['trips_2025']):>15,} ${row['fare_2025']:>11.2f} ${row['revenue_2025']:>17,.2f}")
+            logger.opt(lazy=True).info("{}", lambda: f"{taxi_type:<15} {'Change':<10} {row['trip_change_pct']:>14.1f}% {row['fare_change_pct']:>11.1f}% {row['revenue_change_pct']:>16.1f}%")
+            logger.info("-" * 80)
         
         # Save comparison
         comparison_path = AGGREGATED_DIR / "yellow_vs_green_q1_comparison.parquet"
         
-        # Convert to DuckDB table and save
         if comparison_data:
-            import pandas as pd
-            df = pd.DataFrame(comparison_data)
-            con.execute(f"COPY (SELECT * FROM df) TO '{comparison_path}' (FORMAT PARQUET)")
+            pq.write_table(comparison, str(comparison_path), compression='zstd', compression_level=3)
             logger.success(f"Saved comparison to {comparison_path}")
         
-        con.close()
         return {'comparison_data': comparison_data}
         
     except Exception as e:
@@ -261,6 +258,8 @@ if __name__ == "__main__":
     Time: ~5-10 minutes
     """
     
+    configure_logging(LOGS_DIR / "analysis.log", rotation="10 MB")
+    
     # Analyze leakage
     leakage_stats = analyze_leakage_and_compliance()
     
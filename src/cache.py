@@ -0,0 +1,106 @@
+"""
+Phase Result Cache
+==================
+
+Lets the pipeline skip phases whose inputs have not changed since their last
+successful run.
+
+How it works:
+- Each phase declares its inputs (files) and parameters (config values)
+- causal_hash() hashes those BEFORE the phase runs, so the key never depends
+  on the phase's own output
+- A successful run leaves an empty marker file CACHE_DIR/<hash>.done
+- Next run: same inputs + same params + same code -> marker exists -> skip
+
+Large files are fingerprinted by size + modification time (hashing 50 GB of
+parquet would cost more than most phases); small files such as the phase's
+own source module are hashed by content.
+
+To force a full re-run, delete data/.cache/.
+"""
+
+import hashlib
+import functools
+from pathlib import Path
+from loguru import logger
+
+from .config import CACHE_DIR
+
+# Files up to this size are hashed by content instead of size + mtime
+CONTENT_HASH_MAX_BYTES = 1024 * 1024
+
+
+def causal_hash(phase_name: str, input_paths: list, params: dict = None) -> str:
+    """
+    Compute the cache key for one phase run.
+    
+    Args:
+        phase_name: Phase identifier (include a version suffix to invalidate)
+        input_paths: Files the phase reads
+        params: Configuration values the phase depends on
+    
+    Returns:
+        Hex digest identifying this exact combination of inputs
+    """
+    h = hashlib.blake2b(digest_size=20)
+    h.update(phase_name.encode())
+    
+    for path in sorted(Path(p) for p in input_paths):
+        h.update(str(path).encode())
+        
+        if not path.exists():
+            h.update(b"<missing>")
+            continue
+        
+        st = path.stat()
+        if st.st_size <= CONTENT_HASH_MAX_BYTES:
+            h.update(path.read_bytes())
+        else:
+            h.update(f"{st.st_size}:{st.st_mtime_ns}".encode())
+    
+    for key, value in sorted((params or {}).items()):
+        h.update(f"{key}={value!r}".encode())
+    
+    return h.hexdigest()
+
+
+def cached_phase(phase_name: str, inputs, params=None, outputs=None):
+    """
+    Decorator that skips a phase function when its causal hash was already
+    recorded by a successful run.
+    
+    Args:
+        phase_name: Phase identifier used in the hash and the logs
+        inputs: Callable returning the list of input paths (evaluated per call,
+                so globs see the current state of the filesystem)
+        params: Optional dict of configuration values to include in the key
+        outputs: Optional callable returning paths that must still exist for
+                 a cache hit to be trusted
+    
+    The wrapped function must return True on success; only then is the
+    marker written.
+    """
+    
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = causal_hash(phase_name, inputs(), params)
+            marker = CACHE_DIR / f"{key}.done"
+            
+            outputs_present = outputs is None or all(Path(p).exists() for p in outputs())
+            
+            if marker.exists() and outputs_present:
+                logger.info(f"{phase_name}: cache hit ({key[:12]}), skipping")
+                return True
+            
+            result = fn(*args, **kwargs)
+            
+            if result:
+                CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                marker.touch()
+            
+            return result
+        
+        return wrapper
+    
+    return decorator
@@ -27,23 +27,110 @@ How we handle them:
 """
 
 import duckdb
+import numpy as np
+import os
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from loguru import logger
 import sys
 
 from .config import (
-    UNIFIED_DIR, GHOST_TRIPS_DIR,
+    UNIFIED_DIR, GHOST_TRIPS_DIR, UNIFIED_SCHEMA,
     MAX_SPEED_MPH, MIN_TRIP_DURATION_SECONDS, HIGH_FARE_THRESHOLD,
-    MIN_DISTANCE_MILES, LOGS_DIR
+    MIN_DISTANCE_MILES, NUMPY_CLEANING_MAX_BYTES, LOGS_DIR, configure_logging, connect
 )
+from .schema import update_manifest
 
-# Setup logging
-logger.remove()
-logger.add(sys.stderr, format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}")
-logger.add(LOGS_DIR / "cleaning.log", rotation="10 MB")
 
+# One connection per process, reused for every file that process cleans so
+# Parquet metadata and settings survive between files
+_CON = None
 
-def detect_ghost_trips(input_path: Path, output_clean_path: Path, output_ghost_path: Path) -> dict:
+# Every value ghost_flag can take; stored as an ENUM so each row carries a
+# 1-byte code instead of the string
+GHOST_FLAGS = (
+    'clean', 'excessive_speed', 'short_trip_high_fare',
+    'zero_distance_positive_fare', 'negative_duration', 'negative_fare'
+)
+
+
+def get_connection(threads: int = None) -> duckdb.DuckDBPyConnection:
+    """
+    Return this process's DuckDB connection, creating it on first use.
+    
+    Args:
+        threads: Optional thread cap (overrides DUCKDB_THREADS)
+    """
+    
+    global _CON
+    
+    if _CON is None:
+        _CON = connect(threads)
+        _CON.execute(f"CREATE TYPE ghost_flag_t AS ENUM {GHOST_FLAGS}")
+    elif threads:
+        _CON.execute(f"SET threads={threads}")
+    
+    return _CON
+
+
+def _split_ghost_trips_numpy(input_path: Path, output_clean_path: Path, output_ghost_path: Path) -> None:
+    """
+    In-memory equivalent of the DuckDB flag + COPY steps for small files.
+    
+    Applies the same rules in the same order as the SQL CASE, as NumPy
+    masks over the whole file, and writes identical clean/ghost outputs.
+    NaN comparisons are False, so NULLs fall through the rules exactly
+    like they do in SQL.
+    """
+    
+    tbl = pq.read_table(input_path)
+    
+    def column(name):
+        return tbl.column(name).to_numpy().astype(np.float64)
+    
+    pickup = tbl.column('pickup_time').to_numpy()
+    dropoff = tbl.column('dropoff_time').to_numpy()
+    duration = (dropoff - pickup) / np.timedelta64(1, 's')
+    distance = column('trip_distance')
+    fare = column('fare')
+    total = column('total_amount')
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        speed = np.where(duration > 0, distance * 3600.0 / duration, 0.0)
+    
+    # First matching rule wins, same order as the SQL CASE
+    ghost_flag = np.select(
+        [
+            duration <= 0,
+            (fare < 0) | (total < 0),
+            (distance <= MIN_DISTANCE_MILES) & (fare > 0),
+            distance * 3600.0 > MAX_SPEED_MPH * duration,
+            (duration < MIN_TRIP_DURATION_SECONDS) & (fare > HIGH_FARE_THRESHOLD),
+        ],
+        ['negative_duration', 'negative_fare', 'zero_distance_positive_fare',
+         'excessive_speed', 'short_trip_high_fare'],
+        default='clean'
+    )
+    is_ghost = pa.array(ghost_flag != 'clean')
+    
+    pq.write_table(
+        tbl.select(UNIFIED_SCHEMA).filter(pc.invert(is_ghost)), output_clean_path,
+        compression='zstd', compression_level=1, row_group_size=1000000
+    )
+    
+    ghost = tbl.append_column('duration_seconds', pa.array(duration, from_pandas=True))
+    ghost = ghost.append_column('speed_mph', pa.array(speed, from_pandas=True))
+    ghost = ghost.append_column('ghost_flag', pa.array(ghost_flag, pa.string()).dictionary_encode())
+    ghost = ghost.filter(is_ghost)
+    ghost = ghost.append_column('source_file', pa.array([input_path.name] * ghost.num_rows, pa.string()))
+    pq.write_table(ghost, output_ghost_path, compression='zstd')
+
+
+def detect_ghost_trips(input_path: Path, output_clean_path: Path, output_ghost_path: Path,
+                       threads: int = None, con: duckdb.DuckDBPyConnection = None) -> pa.Table:
     """
     Detect and separate ghost trips from clean trips.
     
@@ -51,9 +138,12 @@ def detect_ghost_trips(input_path: Path, output_clean_path: Path, output_ghost_p
         input_path: Path to unified parquet file
         output_clean_path: Path to save clean trips
         output_ghost_path: Path to save ghost trips
+        threads: DuckDB thread cap (set when several files run in parallel)
+        con: Connection to use (defaults to this process's shared one)
     
     Returns:
-        Dictionary with detection statistics
+        Arrow table of per-flag statistics tagged with the source file
+        (None on failure)
     
     Detection Logic:
     
@@ -73,103 +163,159 @@ def detect_ghost_trips(input_path: Path, output_clean_path: Path, output_ghost_p
     try:
         logger.info(f"Detecting ghost trips in {input_path.name}...")
         
-        con = duckdb.connect()
+        con = con or get_connection(threads)
         
-        # Build ghost trip detection query
-        ghost_query = f"""
-        CREATE TEMP TABLE all_trips AS
-        SELECT *,
-            -- Calculate trip duration in seconds
-            EPOCH(dropoff_time - pickup_time) AS duration_seconds,
+        # Small files fit comfortably in memory: flag them with NumPy and
+        # skip DuckDB's planning and the second scan of the view
+        if input_path.stat().st_size <= NUMPY_CLEANING_MAX_BYTES:
+            _split_ghost_trips_numpy(input_path, output_clean_path, output_ghost_path)
+        else:
+            # Detection thresholds are bound as parameters into a one-row table
+            # (DuckDB views can't take parameters), so the flag SQL below is the
+            # same text for every file
+            con.execute("""
+            CREATE OR REPLACE TEMP TABLE ghost_thresholds (
+                max_speed_mph DOUBLE,
+                min_trip_duration_seconds DOUBLE,
+                high_fare_threshold DOUBLE,
+                min_distance_miles DOUBLE
+            )
+            """)
+            con.execute(
+                "INSERT INTO ghost_thresholds VALUES ($1, $2, $3, $4)",
+                [MAX_SPEED_MPH, MIN_TRIP_DURATION_SECONDS, HIGH_FARE_THRESHOLD, MIN_DISTANCE_MILES]
+            )
             
-            -- Calculate speed in mph
-            CASE 
-                WHEN EPOCH(dropoff_time - pickup_time) > 0 THEN
-                    (trip_distance / (EPOCH(dropoff_time - pickup_time) / 3600.0))
-                ELSE 
-                    0
-            END AS speed_mph,
+            # Build ghost trip detection query
+            # Flagging is a VIEW, not a materialized table: each COPY below
+            # streams straight from the input parquet through the flag logic
+            ghost_query = f"""
+            CREATE OR REPLACE VIEW all_trips AS
+            WITH durations AS (
+                SELECT *,
+                    -- Calculate trip duration in seconds (once per row)
+                    EPOCH(dropoff_time - pickup_time) AS duration_seconds
+                FROM read_parquet('{input_path}')
+            ),
+            speeds AS (
+                SELECT *,
+                    -- Calculate speed in mph
+                    CASE 
+                        WHEN duration_seconds > 0 THEN
+                            trip_distance * 3600.0 / duration_seconds
+                        ELSE 
+                            0
+                    END AS speed_mph
+                FROM durations
+            )
+            SELECT *,
+                -- Boolean split used by the two COPYs (cheaper than comparing strings)
+                ghost_flag != 'clean' AS is_ghost
+            FROM (
+            SELECT speeds.*,
+                -- Flag ghost trips
+                CAST(CASE
+                    -- Rules are checked cheapest first; once Rule 4 has passed,
+                    -- every later branch can assume duration_seconds > 0
+                    
+                    -- Rule 4: Negative duration (dropoff before pickup)
+                    WHEN duration_seconds <= 0
+                        THEN 'negative_duration'
+                    
+                    -- Rule 5: Negative fare
+                    WHEN fare < 0 OR total_amount < 0
+                        THEN 'negative_fare'
+                    
+                    -- Rule 3: Zero distance with positive fare
+                    WHEN trip_distance <= t.min_distance_miles
+                         AND fare > 0
+                        THEN 'zero_distance_positive_fare'
+                    
+                    -- Rule 1: Speed > 65 mph, compared without dividing
+                    -- (distance * 3600 > 65 * seconds)
+                    WHEN trip_distance * 3600.0 > t.max_speed_mph * duration_seconds
+                        THEN 'excessive_speed'
+                    
+                    -- Rule 2: Short trip with high fare
+                    WHEN duration_seconds < t.min_trip_duration_seconds
+                         AND fare > t.high_fare_threshold
+                        THEN 'short_trip_high_fare'
+                    
+                    ELSE 'clean'
+                END AS ghost_flag_t) AS ghost_flag
+            FROM speeds
+            CROSS JOIN ghost_thresholds t
+            )
+            """
             
-            -- Flag ghost trips
-            CASE
-                -- Rule 1: Speed > 65 mph
-                WHEN (trip_distance / (EPOCH(dropoff_time - pickup_time) / 3600.0)) > {MAX_SPEED_MPH}
-                    THEN 'excessive_speed'
-                
-                -- Rule 2: Short trip with high fare
-                WHEN EPOCH(dropoff_time - pickup_time) < {MIN_TRIP_DURATION_SECONDS}
-                     AND fare > {HIGH_FARE_THRESHOLD}
-                    THEN 'short_trip_high_fare'
-                
-                -- Rule 3: Zero distance with positive fare
-                WHEN trip_distance <= {MIN_DISTANCE_MILES}
-                     AND fare > 0
-                    THEN 'zero_distance_positive_fare'
-                
-                -- Rule 4: Negative duration (dropoff before pickup)
-                WHEN EPOCH(dropoff_time - pickup_time) <= 0
-                    THEN 'negative_duration'
-                
-                -- Rule 5: Negative fare
-                WHEN fare < 0 OR total_amount < 0
-                    THEN 'negative_fare'
-                
-                ELSE 'clean'
-            END AS ghost_flag
-        FROM read_parquet('{input_path}')
-        """
-        
-        con.execute(ghost_query)
-        
-        # Save clean trips
-        clean_query = f"""
-        COPY (
-            SELECT pickup_time, dropoff_time, pickup_loc, dropoff_loc,
-                   trip_distance, fare, total_amount, congestion_surcharge
-            FROM all_trips
-            WHERE ghost_flag = 'clean'
-        )
-        TO '{output_clean_path}' (FORMAT PARQUET, COMPRESSION ZSTD)
-        """
-        con.execute(clean_query)
-        
-        # Save ghost trips (for audit trail)
-        ghost_save_query = f"""
-        COPY (
-            SELECT *, 
-                   '{input_path.name}' AS source_file
+            con.execute(ghost_query)
+            
+            # Save clean trips (largest output: fast ZSTD level, large row groups
+            # so downstream aggregations read fewer column chunks)
+            # The projection comes from UNIFIED_SCHEMA, so it can't drift from
+            # what Phase 2 writes
+            con.execute(f"""
+            CREATE OR REPLACE VIEW clean_v AS
+            SELECT {', '.join(UNIFIED_SCHEMA)}
             FROM all_trips
-            WHERE ghost_flag != 'clean'
-        )
-        TO '{output_ghost_path}' (FORMAT PARQUET, COMPRESSION ZSTD)
-        """
-        con.execute(ghost_save_query)
+            WHERE NOT is_ghost
+            """)
+            
+            clean_query = f"""
+            COPY clean_v
+            TO '{output_clean_path}' (FORMAT PARQUET, COMPRESSION ZSTD, COMPRESSION_LEVEL 1, ROW_GROUP_SIZE 1000000)
+            """
+            con.execute(clean_query)
+            
+            # Save ghost trips (for audit trail)
+            ghost_save_query = f"""
+            COPY (
+                SELECT * EXCLUDE (is_ghost), 
+                       '{input_path.name}' AS source_file
+                FROM all_trips
+                WHERE is_ghost
+            )
+            TO '{output_ghost_path}' (FORMAT PARQUET, COMPRESSION ZSTD)
+            """
+            con.execute(ghost_save_query)
         
-        # Get statistics
-        stats_query = """
+        # Get statistics from the two outputs rather than re-running the
+        # flag logic: ghost files carry their flag/speed, and clean trips
+        # only need their own speed recomputed from four columns
+        stats_query = f"""
         SELECT 
             ghost_flag,
             COUNT(*) as count,
             ROUND(AVG(speed_mph), 2) as avg_speed_mph,
             ROUND(AVG(fare), 2) as avg_fare,
             ROUND(AVG(trip_distance), 2) as avg_distance
-        FROM all_trips
+        FROM (
+            SELECT 
+                'clean' AS ghost_flag,
+                CASE 
+                    WHEN EPOCH(dropoff_time - pickup_time) > 0 THEN
+                        trip_distance * 3600.0 / EPOCH(dropoff_time - pickup_time)
+                    ELSE 
+                        0
+                END AS speed_mph,
+                fare,
+                trip_distance
+            FROM read_parquet('{output_clean_path}')
+            UNION ALL
+            SELECT ghost_flag, speed_mph, fare, trip_distance
+            FROM read_parquet('{output_ghost_path}')
+        )
         GROUP BY ghost_flag
         ORDER BY count DESC
         """
         
-        stats_result = con.execute(stats_query).fetchall()
-        
-        # Convert to dictionary
-        stats = {}
-        for row in stats_result:
-            flag, count, avg_speed, avg_fare, avg_distance = row
-            stats[flag] = {
-                'count': count,
-                'avg_speed_mph': avg_speed,
-                'avg_fare': avg_fare,
-                'avg_distance': avg_distance
-            }
+        # Keep the stats in Arrow so the caller can sum across files in
+        # DuckDB rather than merging Python dicts
+        stats_tbl = con.execute(stats_query).arrow()
+        stats_tbl = stats_tbl.append_column(
+            'filename', pa.array([input_path.name] * stats_tbl.num_rows, pa.string())
+        )
+        stats = {row['ghost_flag']: row for row in stats_tbl.to_pylist()}
         
         # Log statistics
         total_trips = sum(s['count'] for s in stats.values())
@@ -185,18 +331,22 @@ def detect_ghost_trips(input_path: Path, output_clean_path: Path, output_ghost_p
             if flag != 'clean':
                 logger.warning(f"    {flag}: {data['count']:,} trips")
         
-        con.close()
-        return stats
+        return stats_tbl
         
     except Exception as e:
         logger.error(f"Failed to detect ghost trips in {input_path.name}: {e}")
-        return {}
+        return None
 
 
-def clean_all_files() -> dict:
+def clean_all_files(skip_existing: bool = True) -> dict:
     """
     Detect ghost trips in all unified files.
     
+    Args:
+        skip_existing: Skip unified files that already have a clean output.
+                       Pass False to re-clean everything (e.g. after the
+                       ghost thresholds changed)
+    
     Returns:
         Dictionary with cleaning statistics
     """
@@ -216,8 +366,23 @@ def clean_all_files() -> dict:
     # Create output directory
     GHOST_TRIPS_DIR.mkdir(parents=True, exist_ok=True)
     
-    # Process all unified files
-    unified_files = sorted(UNIFIED_DIR.glob("*.parquet"))
+    # List the directory once; the skip check below is a dict lookup
+    # instead of a stat() per file, and sizes come from the same listing
+    existing = {
+        entry.name: entry.stat().st_size
+        for entry in os.scandir(UNIFIED_DIR) if entry.name.endswith('.parquet')
+    }
+    
+    # Process all unified files, largest first: the pool starts the longest
+    # jobs immediately instead of finishing on one big month while the
+    # other workers sit idle
+    unified_files = [
+        UNIFIED_DIR / name
+        for name in sorted(existing, key=lambda name: -existing[name])
+        if '_unified_' in name
+    ]
+    
+    jobs = []
     
     for input_path in unified_files:
         # Define output paths
@@ -225,28 +390,45 @@ def clean_all_files() -> dict:
         output_ghost_path = GHOST_TRIPS_DIR / input_path.name.replace('unified', 'ghost')
         
         # Skip if already processed
-        if output_clean_path.exists():
+        if skip_existing and output_clean_path.name in existing:
             logger.info(f"Skipping {input_path.name} (already cleaned)")
             continue
         
-        # Detect ghost trips
-        stats = detect_ghost_trips(input_path, output_clean_path, output_ghost_path)
+        jobs.append((input_path, output_clean_path, output_ghost_path))
+    
+    # Each file is independent, so detect ghost trips in parallel processes
+    all_stats = []
+    
+    if jobs:
+        # Half the cores as worker processes, the other half shared out as
+        # DuckDB threads per worker, so workers x threads ~= cores
+        cpu_count = os.cpu_count() or 1
+        workers = min(max(cpu_count // 2, 1), len(jobs))
+        threads_per_worker = max(cpu_count // workers, 1)
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            all_stats = list(executor.map(detect_ghost_trips, *zip(*jobs), [threads_per_worker] * len(jobs)))
+    
+    stats_tables = [tbl for tbl in all_stats if tbl is not None]
+    total_stats['files_processed'] = len(stats_tables)
+    
+    if stats_tables:
+        # Sum the per-file Arrow tables in DuckDB; only one row per flag
+        # comes back to Python
+        totals = get_connection().from_arrow(pa.concat_tables(stats_tables)).aggregate(
+            "ghost_flag, SUM(count) AS count", "ghost_flag"
+        ).fetchall()
         
-        if stats:
-            total_stats['files_processed'] += 1
+        for flag, count in totals:
+            total_stats['total_trips'] += count
             
-            # Aggregate statistics
-            for flag, data in stats.items():
-                total_stats['total_trips'] += data['count']
-                
-                if flag == 'clean':
-                    total_stats['clean_trips'] += data['count']
-                else:
-                    total_stats['ghost_trips'] += data['count']
-                    
-                    if flag not in total_stats['ghost_types']:
-                        total_stats['ghost_types'][flag] = 0
-                    total_stats['ghost_types'][flag] += data['count']
+            if flag == 'clean':
+                total_stats['clean_trips'] += count
+            else:
+                total_stats['ghost_trips'] += count
+                total_stats['ghost_types'][flag] = count
+    
+    update_manifest('clean')
     
     # Print summary
     logger.info("\n" + "=" * 60)
@@ -281,30 +463,67 @@ def analyze_ghost_patterns() -> None:
     try:
         logger.info("\nAnalyzing ghost trip patterns...")
         
-        con = duckdb.connect()
+        con = get_connection()
         
-        # Combine all ghost trip files
-        ghost_files = list(GHOST_TRIPS_DIR.glob("*.parquet"))
+        # Per-file sums/counts are cached in a summary file, so a re-run only
+        # scans ghost files written since the summary was last saved
+        summary_path = GHOST_TRIPS_DIR / "_summary.parquet"
+        ghost_files = [
+            entry for entry in os.scandir(GHOST_TRIPS_DIR)
+            if entry.name.endswith('.parquet') and not entry.name.startswith('_')
+        ]
         
         if not ghost_files:
             logger.warning("No ghost trip files found")
             return
         
-        # Create pattern analysis
-        pattern_query = f"""
-        SELECT 
-            ghost_flag,
-            COUNT(*) as count,
-            ROUND(AVG(speed_mph), 2) as avg_speed,
-            ROUND(AVG(fare), 2) as avg_fare,
-            ROUND(AVG(trip_distance), 2) as avg_distance,
-            ROUND(AVG(duration_seconds), 2) as avg_duration_sec
-        FROM read_parquet('{GHOST_TRIPS_DIR}/*.parquet')
-        GROUP BY ghost_flag
-        ORDER BY count DESC
-        """
+        summary_mtime = summary_path.stat().st_mtime if summary_path.exists() else 0
+        stale_files = [entry.path for entry in ghost_files if entry.stat().st_mtime > summary_mtime]
+        fresh_files = [entry.path for entry in ghost_files if entry.stat().st_mtime <= summary_mtime]
         
-        results = con.execute(pattern_query).fetchall()
+        summary_parts = []
+        summary_changed = bool(stale_files)
+        
+        if summary_path.exists():
+            # Keep cached rows only for files that still exist and haven't changed
+            cached = pq.read_table(summary_path)
+            kept = cached.filter(pc.is_in(cached['filename'], value_set=pa.array(fresh_files, pa.string())))
+            summary_changed = summary_changed or kept.num_rows != cached.num_rows
+            summary_parts.append(kept)
+        
+        if stale_files:
+            logger.info(f"Scanning {len(stale_files)} new ghost file(s)")
+            
+            # Explicit file list + union_by_name: footers are read in
+            # parallel and files with differing columns still line up
+            per_file_query = """
+            SELECT 
+                filename,
+                ghost_flag,
+                COUNT(*) as count,
+                SUM(speed_mph) as speed_sum, COUNT(speed_mph) as speed_n,
+                SUM(fare) as fare_sum, COUNT(fare) as fare_n,
+                SUM(trip_distance) as distance_sum, COUNT(trip_distance) as distance_n,
+                SUM(duration_seconds) as duration_sum, COUNT(duration_seconds) as duration_n
+            FROM read_parquet(?, union_by_name = true, filename = true)
+            GROUP BY filename, ghost_flag
+            """
+            summary_parts.append(con.execute(per_file_query, [stale_files]).arrow())
+        
+        summary = pa.concat_tables(summary_parts)
+        
+        if summary_changed:
+            pq.write_table(summary, summary_path)
+        
+        # Create pattern analysis from the per-file sums
+        results = con.from_arrow(summary).aggregate("""
+            ghost_flag,
+            SUM(count) as count,
+            ROUND(SUM(speed_sum) / SUM(speed_n), 2) as avg_speed,
+            ROUND(SUM(fare_sum) / SUM(fare_n), 2) as avg_fare,
+            ROUND(SUM(distance_sum) / SUM(distance_n), 2) as avg_distance,
+            ROUND(SUM(duration_sum) / SUM(duration_n), 2) as avg_duration_sec
+        """, "ghost_flag").order("count DESC").fetchall()
         
         logger.info("\nGhost Trip Patterns:")
         logger.info("-" * 80)
@@ -315,8 +534,6 @@ def analyze_ghost_patterns() -> None:
             ghost_type, count, avg_speed, avg_fare, avg_dist, avg_dur = row
             logger.info(f"{ghost_type:<30} {count:>10,} {avg_speed:>12.1f} {avg_fare:>10.2f} {avg_dist:>10.2f}")
         
-        con.close()
-        
     except Exception as e:
         logger.error(f"Failed to analyze ghost patterns: {e}")
 
@@ -337,6 +554,8 @@ if __name__ == "__main__":
     Time: ~15-30 minutes depending on data size
     """
     
+    configure_logging(LOGS_DIR / "cleaning.log", rotation="10 MB")
+    
     # Clean all files
     stats = clean_all_files()
     
@@ -11,8 +11,12 @@ Why separate config?
 - Prevents hardcoded values scattered across files
 """
 
+import os
+import sys
+import duckdb
 from pathlib import Path
 from datetime import datetime
+from loguru import logger
 
 # ============================================
 # PROJECT PATHS
@@ -36,6 +40,12 @@ TAXI_ZONES_DIR = RAW_DIR / "taxi_zones"
 UNIFIED_DIR = PROCESSED_DIR / "unified"
 GHOST_TRIPS_DIR = PROCESSED_DIR / "ghost_trips"
 
+# File listing of unified/clean outputs (see schema.update_manifest)
+MANIFEST_FILE = AGGREGATED_DIR / "manifest.parquet"
+
+# Phase cache markers (see src/cache.py)
+CACHE_DIR = DATA_DIR / ".cache"
+
 # Output directories
 OUTPUT_DIR = PROJECT_ROOT / "outputs"
 FIGURES_DIR = OUTPUT_DIR / "figures"
@@ -48,6 +58,10 @@ LOGS_DIR = OUTPUT_DIR / "logs"
 # NYC TLC Trip Record Data
 TLC_BASE_URL = "https://d37ci6vzurychx.cloudfront.net/trip-data"
 
+# TLC page listing every published trip-record file
+TLC_INDEX_URL = "https://www.nyc.gov/site/tlc/about/tlc-trip-record-data.page"
+TLC_INDEX_TTL_HOURS = 24  # Re-scrape the index at most once a day
+
 # File naming patterns
 YELLOW_PATTERN = "yellow_tripdata_{year}-{month:02d}.parquet"
 GREEN_PATTERN = "green_tripdata_{year}-{month:02d}.parquet"
@@ -55,6 +69,12 @@ GREEN_PATTERN = "green_tripdata_{year}-{month:02d}.parquet"
 # Taxi zone shapefile
 TAXI_ZONES_URL = "https://d37ci6vzurychx.cloudfront.net/misc/taxi_zones.zip"
 
+# Parallel downloads (files are independent and network-bound)
+DOWNLOAD_WORKERS = 8
+
+# Stop starting new downloads after this many files in a row fail every retry
+MAX_CONSECUTIVE_FAILURES = 5
+
 # ============================================
 # TIME PERIODS
 # ============================================
@@ -66,6 +86,9 @@ MONTHS_TO_DOWNLOAD = list(range(1, 13))  # Jan-Dec
 # Congestion pricing start date
 CONGESTION_START_DATE = datetime(2025, 1, 5)
 
+# Congestion toll used to estimate revenue lost per trip without surcharge
+CONGESTION_SURCHARGE = 9.0
+
 # Comparison periods
 Q1_2024_MONTHS = [1, 2, 3]  # Jan-Mar 2024 (before)
 Q1_2025_MONTHS = [1, 2, 3]  # Jan-Mar 2025 (after)
@@ -168,6 +191,10 @@ DUCKDB_MEMORY_LIMIT = "4GB"  # Adjust based on your machine
 # Number of threads (use all available cores)
 DUCKDB_THREADS = -1  # -1 = auto-detect
 
+# Files up to this size are flagged in memory with NumPy (Phase 3);
+# larger ones stream through DuckDB
+NUMPY_CLEANING_MAX_BYTES = 64 * 1024 * 1024
+
 # ============================================
 # WEATHER DATA
 # ============================================
@@ -176,6 +203,7 @@ DUCKDB_THREADS = -1  # -1 = auto-detect
 WEATHER_STATION = "72505"  # NOAA station ID
 WEATHER_START_DATE = "2023-01-01"
 WEATHER_END_DATE = "2025-12-31"
+WEATHER_CACHE_TTL_HOURS = 24 * 7  # Re-fetch from Meteostat at most once a week
 
 # ============================================
 # VISUALIZATION SETTINGS
@@ -203,13 +231,50 @@ def create_directories():
     dirs = [
         RAW_DIR, YELLOW_RAW_DIR, GREEN_RAW_DIR, TAXI_ZONES_DIR,
         PROCESSED_DIR, UNIFIED_DIR, GHOST_TRIPS_DIR,
-        AGGREGATED_DIR, OUTPUT_DIR, FIGURES_DIR, LOGS_DIR
+        AGGREGATED_DIR, OUTPUT_DIR, FIGURES_DIR, LOGS_DIR, CACHE_DIR
     ]
     for dir_path in dirs:
         dir_path.mkdir(parents=True, exist_ok=True)
     print("✓ All directories created/verified")
 
 
+def configure_logging(log_file: Path, rotation: str = None, enqueue: bool = False,
+                      console_level: str = "INFO"):
+    """
+    Install the stderr + log file sinks for this process.
+    Call this once from an entry point (pipeline.main() or a module's
+    __main__ block), never at import time, so one module can't drop the
+    sinks another entry point set up.
+    
+    Args:
+        log_file: File sink path
+        rotation: Optional loguru rotation for the file sink (e.g. "10 MB")
+        enqueue: Write the file sink from a background queue, so callers
+                 in hot loops (or worker processes) only pay a queue put
+        console_level: Minimum level echoed to stderr
+    """
+    logger.remove()
+    logger.add(sys.stderr, format="{time:HH:mm:ss} | {level: <8} | {message}", level=console_level)
+    logger.add(log_file, format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}",
+               rotation=rotation, enqueue=enqueue)
+
+
+def connect(threads: int = None) -> duckdb.DuckDBPyConnection:
+    """
+    Open a DuckDB connection with the settings above applied.
+    Use this instead of duckdb.connect() so every phase honours the
+    memory limit and thread count.
+    
+    Args:
+        threads: Optional thread cap (overrides DUCKDB_THREADS)
+    """
+    con = duckdb.connect()
+    con.execute(f"SET memory_limit='{DUCKDB_MEMORY_LIMIT}'")
+    con.execute(f"SET threads={threads or (os.cpu_count() if DUCKDB_THREADS == -1 else DUCKDB_THREADS)}")
+    con.execute("PRAGMA enable_object_cache")
+    return con
+
+
 if __name__ == "__main__":
     # Test configuration
     print("=" * 50)
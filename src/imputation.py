@@ -23,7 +23,12 @@ How it works:
 6. Save with clear labeling (IMPUTED)
 """
 
-import duckdb
+import numpy as np
+import os
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 from pathlib import Path
 from loguru import logger
 import sys
@@ -31,13 +36,21 @@ from datetime import datetime
 
 from .config import (
     UNIFIED_DIR, DEC_2023_WEIGHT, DEC_2024_WEIGHT,
-    LOGS_DIR
+    LOGS_DIR, configure_logging
 )
 
-# Setup logging
-logger.remove()
-logger.add(sys.stderr, format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}")
-logger.add(LOGS_DIR / "imputation.log", rotation="10 MB")
+# Columns read from each December file
+DAILY_COLUMNS = [
+    'pickup_time', 'pickup_loc', 'dropoff_loc',
+    'fare', 'total_amount', 'trip_distance', 'congestion_surcharge'
+]
+
+# Columns averaged per day (NULLs excluded, like SQL AVG)
+AVERAGED_COLUMNS = ['fare', 'total_amount', 'trip_distance']
+
+# Array sizes: day of month 1-31 (index 0 unused), TLC LocationIDs 1-265
+DAYS = 32
+LOCATIONS = 266
 
 
 def check_december_2025_exists() -> bool:
@@ -48,10 +61,13 @@ def check_december_2025_exists() -> bool:
         True if both Yellow and Green Dec 2025 files exist
     """
     
-    yellow_dec_2025 = list(UNIFIED_DIR.glob("*yellow*2025-12*.parquet"))
-    green_dec_2025 = list(UNIFIED_DIR.glob("*green*2025-12*.parquet"))
+    # One directory listing, filtered in Python for both taxi types
+    dec_2025 = [
+        entry.name for entry in os.scandir(UNIFIED_DIR)
+        if '2025-12' in entry.name and entry.name.endswith('.parquet')
+    ] if UNIFIED_DIR.exists() else []
     
-    exists = len(yellow_dec_2025) > 0 and len(green_dec_2025) > 0
+    exists = any('yellow' in name for name in dec_2025) and any('green' in name for name in dec_2025)
     
     if exists:
         logger.info("December 2025 data found - no imputation needed")
@@ -61,6 +77,74 @@ def check_december_2025_exists() -> bool:
     return exists
 
 
+def daily_stats(input_path: Path) -> dict:
+    """
+    Aggregate one December file to daily statistics.
+    
+    Args:
+        input_path: Unified/clean parquet file for one December
+    
+    Returns:
+        Dictionary of NumPy arrays indexed by day of month (index 0 unused):
+        trip_count, *_sum / *_count pairs, and pickup/dropoff counts per
+        (day, location)
+    
+    How it stays cheap:
+    - Only the 7 needed columns are read, one record batch at a time
+    - Every statistic is a np.bincount over day of month - one vectorized
+      pass per column, no query planning
+    - Typical locations are the argmax of a (day x location) count table,
+      not a per-group MODE
+    """
+    
+    trip_count = np.zeros(DAYS, dtype=np.int32)
+    sums = {column: np.zeros(DAYS) for column in AVERAGED_COLUMNS}
+    counts = {column: np.zeros(DAYS, dtype=np.int32) for column in AVERAGED_COLUMNS}
+    congestion_sum = np.zeros(DAYS)
+    pickups = np.zeros(DAYS * LOCATIONS, dtype=np.int32)
+    dropoffs = np.zeros(DAYS * LOCATIONS, dtype=np.int32)
+    
+    for batch in ds.dataset(str(input_path)).to_batches(columns=DAILY_COLUMNS):
+        # Day of month fits in one byte; counts fit in 32 bits
+        day = pc.day(batch.column('pickup_time')).fill_null(0).cast(pa.uint8()).to_numpy(zero_copy_only=False)
+        
+        day_count = np.bincount(day, minlength=DAYS).astype(np.int32)
+        trip_count += day_count
+        
+        for column in AVERAGED_COLUMNS:
+            values = batch.column(column).to_numpy(zero_copy_only=False).astype(np.float64)
+            
+            # Columns without nulls (the usual case) share the one per-day
+            # count above instead of masking and counting again
+            if batch.column(column).null_count == 0:
+                sums[column] += np.bincount(day, weights=values, minlength=DAYS)
+                counts[column] += day_count
+            else:
+                present = ~np.isnan(values)
+                sums[column] += np.bincount(day[present], weights=values[present], minlength=DAYS)
+                counts[column] += np.bincount(day[present], minlength=DAYS).astype(np.int32)
+        
+        # Unified files store 0 for a missing surcharge; nan_to_num only
+        # covers files unified before that (NULL read back as NaN)
+        surcharge = batch.column('congestion_surcharge').to_numpy(zero_copy_only=False).astype(np.float64)
+        congestion_sum += np.bincount(day, weights=np.nan_to_num(surcharge), minlength=DAYS)
+        
+        for target, column in [(pickups, 'pickup_loc'), (dropoffs, 'dropoff_loc')]:
+            loc = batch.column(column).to_numpy(zero_copy_only=False)
+            known = (loc >= 0) & (loc < LOCATIONS)
+            cell = day[known].astype(np.int32) * LOCATIONS + loc[known].astype(np.int32)
+            target += np.bincount(cell, minlength=DAYS * LOCATIONS).astype(np.int32)
+    
+    return {
+        'trip_count': trip_count,
+        'sums': sums,
+        'counts': counts,
+        'congestion_sum': congestion_sum,
+        'pickups': pickups.reshape(DAYS, LOCATIONS),
+        'dropoffs': dropoffs.reshape(DAYS, LOCATIONS),
+    }
+
+
 def impute_december_2025(taxi_type: str) -> bool:
     """
     Impute December 2025 data using weighted average.
@@ -94,8 +178,6 @@ def impute_december_2025(taxi_type: str) -> bool:
     try:
         logger.info(f"Imputing December 2025 for {taxi_type} taxi...")
         
-        con = duckdb.connect()
-        
         # Find December files
         dec_2023_files = list(UNIFIED_DIR.glob(f"*{taxi_type}*2023-12*.parquet"))
         dec_2024_files = list(UNIFIED_DIR.glob(f"*{taxi_type}*2024-12*.parquet"))
@@ -104,92 +186,51 @@ def impute_december_2025(taxi_type: str) -> bool:
             logger.error(f"Missing December 2023 or 2024 data for {taxi_type}")
             return False
         
-        # Aggregate December 2023 to daily stats
-        dec_2023_query = f"""
-        CREATE TEMP TABLE dec_2023_daily AS
-        SELECT 
-            EXTRACT(DAY FROM pickup_time) as day_of_month,
-            COUNT(*) as trip_count,
-            AVG(fare) as avg_fare,
-            AVG(total_amount) as avg_total,
-            AVG(trip_distance) as avg_distance,
-            AVG(COALESCE(congestion_surcharge, 0)) as avg_congestion,
-            MODE(pickup_loc) as typical_pickup,
-            MODE(dropoff_loc) as typical_dropoff
-        FROM read_parquet('{dec_2023_files[0]}')
-        GROUP BY day_of_month
-        """
-        con.execute(dec_2023_query)
+        # Aggregate December 2023 and 2024 to daily stats
+        dec_2023 = daily_stats(dec_2023_files[0])
+        dec_2024 = daily_stats(dec_2024_files[0])
+        
+        # Apply weighted formula (days present in both years only)
+        both_years = (dec_2023['trip_count'] > 0) & (dec_2024['trip_count'] > 0)
+        both_years[0] = False
+        days = np.flatnonzero(both_years)
         
-        # Aggregate December 2024 to daily stats
-        dec_2024_query = f"""
-        CREATE TEMP TABLE dec_2024_daily AS
-        SELECT 
-            EXTRACT(DAY FROM pickup_time) as day_of_month,
-            COUNT(*) as trip_count,
-            AVG(fare) as avg_fare,
-            AVG(total_amount) as avg_total,
-            AVG(trip_distance) as avg_distance,
-            AVG(COALESCE(congestion_surcharge, 0)) as avg_congestion,
-            MODE(pickup_loc) as typical_pickup,
-            MODE(dropoff_loc) as typical_dropoff
-        FROM read_parquet('{dec_2024_files[0]}')
-        GROUP BY day_of_month
-        """
-        con.execute(dec_2024_query)
+        def weighted(values_2023, values_2024):
+            return DEC_2023_WEIGHT * values_2023[days] + DEC_2024_WEIGHT * values_2024[days]
         
-        # Apply weighted formula
-        imputed_query = f"""
-        CREATE TEMP TABLE dec_2025_imputed AS
-        SELECT 
-            d23.day_of_month,
-            CAST(
-                {DEC_2023_WEIGHT} * d23.trip_count + 
-                {DEC_2024_WEIGHT} * d24.trip_count 
-            AS INTEGER) as imputed_trip_count,
-            {DEC_2023_WEIGHT} * d23.avg_fare + 
-            {DEC_2024_WEIGHT} * d24.avg_fare as imputed_avg_fare,
-            {DEC_2023_WEIGHT} * d23.avg_total + 
-            {DEC_2024_WEIGHT} * d24.avg_total as imputed_avg_total,
-            {DEC_2023_WEIGHT} * d23.avg_distance + 
-            {DEC_2024_WEIGHT} * d24.avg_distance as imputed_avg_distance,
-            {DEC_2023_WEIGHT} * d23.avg_congestion + 
-            {DEC_2024_WEIGHT} * d24.avg_congestion as imputed_avg_congestion,
-            d24.typical_pickup,
-            d24.typical_dropoff
-        FROM dec_2023_daily d23
-        JOIN dec_2024_daily d24 ON d23.day_of_month = d24.day_of_month
-        """
-        con.execute(imputed_query)
+        def average(stats, column):
+            return np.divide(stats['sums'][column], stats['counts'][column],
+                             out=np.full(DAYS, np.nan), where=stats['counts'][column] > 0)
+        
+        imputed = {
+            'day_of_month': days,
+            'imputed_trip_count': np.rint(weighted(dec_2023['trip_count'], dec_2024['trip_count'])).astype(np.int32),
+            'imputed_avg_fare': weighted(average(dec_2023, 'fare'), average(dec_2024, 'fare')),
+            'imputed_avg_total': weighted(average(dec_2023, 'total_amount'), average(dec_2024, 'total_amount')),
+            'imputed_avg_distance': weighted(average(dec_2023, 'trip_distance'), average(dec_2024, 'trip_distance')),
+            'imputed_avg_congestion': weighted(
+                dec_2023['congestion_sum'] / np.maximum(dec_2023['trip_count'], 1),
+                dec_2024['congestion_sum'] / np.maximum(dec_2024['trip_count'], 1)
+            ),
+            'typical_pickup': dec_2024['pickups'][days].argmax(axis=1).astype(np.int32),
+            'typical_dropoff': dec_2024['dropoffs'][days].argmax(axis=1).astype(np.int32),
+        }
         
         # Save imputed statistics (not full synthetic trips, just aggregates)
         output_path = UNIFIED_DIR / f"{taxi_type}_imputed_dec2025_daily_stats.parquet"
         
-        save_query = f"""
-        COPY (
-            SELECT 
-                day_of_month,
-                imputed_trip_count,
-                imputed_avg_fare,
-                imputed_avg_total,
-                imputed_avg_distance,
-                imputed_avg_congestion,
-                typical_pickup,
-                typical_dropoff,
-                '{DEC_2023_WEIGHT}' as weight_2023,
-                '{DEC_2024_WEIGHT}' as weight_2024,
-                'IMPUTED' as data_source
-            FROM dec_2025_imputed
-        )
-        TO '{output_path}' (FORMAT PARQUET)
-        """
-        con.execute(save_query)
+        table = pa.table({
+            **imputed,
+            'weight_2023': pa.array([str(DEC_2023_WEIGHT)] * len(days)),
+            'weight_2024': pa.array([str(DEC_2024_WEIGHT)] * len(days)),
+            'data_source': pa.array(['IMPUTED'] * len(days)),
+        })
+        pq.write_table(table, str(output_path), compression='snappy', row_group_size=100000)
         
         # Log statistics
-        total_imputed = con.execute("SELECT SUM(imputed_trip_count) FROM dec_2025_imputed").fetchone()[0]
+        total_imputed = int(imputed['imputed_trip_count'].sum())
         logger.success(f"Imputed {total_imputed:,} trips for December 2025 ({taxi_type})")
         
-        con.close()
         return True
         
     except Exception as e:
@@ -256,6 +297,8 @@ if __name__ == "__main__":
     Time: ~2-5 minutes
     """
     
+    configure_logging(LOGS_DIR / "imputation.log", rotation="10 MB")
+    
     # Impute missing data
     stats = impute_all_missing_data()
     
@@ -10,6 +10,7 @@ Creates a comprehensive PDF audit report with:
 - Policy recommendations
 """
 
+from reportlab import rl_config
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
@@ -17,19 +18,244 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle, Image as RLImage
 from reportlab.lib import colors
 from datetime import datetime
+import hashlib
 from pathlib import Path
-import duckdb
+import pyarrow.parquet as pq
 
-from src.config import AGGREGATED_DIR, FIGURES_DIR, OUTPUT_DIR
+from src.config import AGGREGATED_DIR, FIGURES_DIR, OUTPUT_DIR, connect
+
+
+# The report is built from a fixed, trusted template, so skip ReportLab's
+# per-attribute validation while building it
+rl_config.shapeChecking = 0
+
+# Paragraph styles, built once at import: getSampleStyleSheet() creates a
+# few dozen styles per call, so it shouldn't run on every report build
+_STYLES = getSampleStyleSheet()
+_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_STYLES['Heading1'],
+    fontSize=24,
+    textColor=colors.HexColor('#1f77b4'),
+    spaceAfter=30,
+    alignment=TA_CENTER,
+    fontName='Helvetica-Bold'
+)
+
+_HEADING_STYLE = ParagraphStyle(
+    'CustomHeading',
+    parent=_STYLES['Heading2'],
+    fontSize=16,
+    textColor=colors.HexColor('#2c3e50'),
+    spaceAfter=12,
+    spaceBefore=12,
+    fontName='Helvetica-Bold'
+)
+
+_SUBHEADING_STYLE = ParagraphStyle(
+    'CustomSubHeading',
+    parent=_STYLES['Heading3'],
+    fontSize=13,
+    textColor=colors.HexColor('#34495e'),
+    spaceAfter=8,
+    spaceBefore=8,
+    fontName='Helvetica-Bold'
+)
+
+_BODY_STYLE = ParagraphStyle(
+    'CustomBody',
+    parent=_STYLES['BodyText'],
+    fontSize=11,
+    alignment=TA_JUSTIFY,
+    spaceAfter=12,
+)
+
+_SUBTITLE_STYLE = ParagraphStyle('Subtitle', parent=_STYLES['Normal'], fontSize=14, alignment=TA_CENTER, textColor=colors.grey)
+_DATE_STYLE = ParagraphStyle('Date', parent=_STYLES['Normal'], fontSize=12, alignment=TA_CENTER, textColor=colors.grey)
+_SUBTITLE2_STYLE = ParagraphStyle('Subtitle2', parent=_STYLES['Normal'], fontSize=11, alignment=TA_CENTER, textColor=colors.grey, fontName='Helvetica-Oblique')
+_LINE_STYLE = ParagraphStyle('Line', parent=_STYLES['Normal'], alignment=TA_CENTER, fontSize=8)
+_FOOTER_STYLE = ParagraphStyle('Footer', parent=_STYLES['Normal'], fontSize=9, alignment=TA_CENTER, textColor=colors.grey)
+_FOOTER2_STYLE = ParagraphStyle('Footer2', parent=_STYLES['Normal'], fontSize=8, alignment=TA_CENTER, textColor=colors.grey, fontName='Helvetica-Oblique')
+
+
+# Static report content, defined once at import
+TOC_ITEMS = (
+    "1. Executive Summary",
+    "2. Key Findings & Statistics",
+    "3. Methodology & Data Sources",
+    "4. Analysis Pipeline",
+    "5. Visual Analysis",
+    "6. Detailed Findings",
+    "7. Policy Recommendations",
+    "8. Conclusion",
+)
+
+VIZ_FILES = (
+    ("time_series_trips.png", "Daily Trip Volume Trends"),
+    ("revenue_analysis.png", "Revenue Growth Analysis"),
+    ("zone_category_distribution.png", "Zone Category Distribution"),
+    ("leakage_analysis.png", "Compliance and Leakage Tracking"),
+)
+
+RECOMMENDATIONS = (
+    ("Enhance Enforcement", "Implement real-time monitoring systems to identify and address non-compliance patterns. Focus enforcement efforts on high-leakage pickup locations."),
+    ("Dynamic Pricing", "Consider weather-adjusted pricing strategies to optimize revenue during high-demand periods while maintaining affordability during normal conditions."),
+    ("Technology Integration", "Mandate automated surcharge collection systems in all TLC-licensed vehicles to reduce human error and intentional non-compliance."),
+    ("Expand Zone Coverage", "Based on effectiveness metrics, evaluate gradual expansion of the congestion zone to additional high-traffic areas."),
+    ("Public Transparency", "Establish a public dashboard showing real-time compliance rates and revenue collection to build public trust and accountability."),
+    ("Data-Driven Adjustments", "Conduct quarterly reviews of pricing and zone boundaries using data analytics to ensure policy objectives are met."),
+)
+
+
+# Table styles are static, so they are built once; the tables themselves are
+# created fresh per report (ReportLab flowables shouldn't be shared between
+# builds)
+_KEY_FINDINGS_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f77b4')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 11),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+])
+
+_PHASES_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+])
+
+_PHASES_DATA = (
+    ['Phase', 'Description', 'Output'],
+    ['1. Data Ingestion', 'Automated download of 72 TLC parquet files (~50 GB) with retry logic and validation', 'Raw parquet files'],
+    ['2. Schema Unification', 'Mapped Yellow and Green taxi columns to unified schema using DuckDB', 'Unified dataset'],
+    ['3. Ghost Trip Detection', 'Identified fraudulent/erroneous records using 5 detection rules', 'Clean dataset + audit trail'],
+    ['4. Missing Data Imputation', 'Handled missing December 2025 data using weighted average (70% Dec 2024, 30% Dec 2023)', 'Complete dataset'],
+    ['5. Zone Filtering', 'Classified trips by congestion zone category using geospatial analysis', 'Zone-categorized trips'],
+    ['6. Leakage Analysis', 'Calculated compliance rates and revenue leakage', 'Compliance metrics'],
+    ['7. Comparative Analysis', 'Yellow vs Green taxi behavior before/after implementation', 'Comparison statistics'],
+    ['8. Visualization', 'Created matplotlib charts (300 DPI PNG images)', '4 visualizations'],
+    ['9. Weather Integration', 'Analyzed weather impact using Meteostat API', 'Weather correlations'],
+)
+
+
+def _make_key_findings_table(total_trips, total_revenue, compliance_rate, leakage_rate,
+                             estimated_lost_revenue, avg_fare, avg_distance) -> Table:
+    """
+    Key Findings table: a fixed row template with the computed values plugged in.
+    """
+    data = [
+        ['Metric', 'Value', 'Interpretation'],
+        ['Total Trips Analyzed', f'{total_trips:,.0f}', 'Post-implementation (Jan 5+)'],
+        ['Congestion Toll Revenue', f'${total_revenue:,.2f}', 'Actual revenue collected'],
+        ['Compliance Rate', f'{compliance_rate:.1f}%', 'Trips with surcharge'],
+        ['Leakage Rate', f'{leakage_rate:.1f}%', 'Trips without surcharge'],
+        ['Estimated Revenue Lost', f'${estimated_lost_revenue:,.2f}', 'Due to non-compliance'],
+        ['Average Fare', f'${avg_fare:.2f}', 'Per trip in zone'],
+        ['Average Distance', f'{avg_distance:.2f} mi', 'Per trip in zone'],
+    ]
+    return Table(data, colWidths=[2.2*inch, 1.8*inch, 2.5*inch], style=_KEY_FINDINGS_STYLE)
+
+
+def _make_phase_table() -> Table:
+    """
+    Analysis Pipeline table (static rows and style, fresh Table per report).
+    """
+    return Table(_PHASES_DATA, colWidths=[0.8*inch, 3.2*inch, 2.5*inch], style=_PHASES_STYLE)
+
+
+def load_zone_stats(zone_file: Path) -> dict:
+    """
+    Post-implementation totals from the zone summary.
+    
+    Returns:
+        Dict with total_trips, total_revenue, trips_with_surcharge,
+        trips_without_surcharge, avg_fare and avg_distance
+    
+    Phase 5 writes these six numbers to audit_stats.parquet next to the zone
+    file, so normally this is a one-row read. If that rollup is missing or
+    older than the zone file, the totals are recomputed from the zone file.
+    Either way the row comes back as an Arrow table and is read by column
+    name, so the result doesn't depend on column order.
+    """
+    stats_file = AGGREGATED_DIR / "audit_stats.parquet"
+    
+    if stats_file.exists() and stats_file.stat().st_mtime >= zone_file.stat().st_mtime:
+        # One-row file: read it straight from parquet, no DuckDB needed
+        table = pq.read_table(stats_file)
+    else:
+        con = connect()
+        table = con.execute(f"""
+            SELECT 
+                SUM(trip_count) as total_trips,
+                SUM(total_congestion_collected) as total_revenue,
+                SUM(trips_with_surcharge) as trips_with_surcharge,
+                SUM(trips_without_surcharge) as trips_without_surcharge,
+                AVG(avg_fare) as avg_fare,
+                AVG(avg_distance) as avg_distance
+            FROM read_parquet('{zone_file}')
+            WHERE after_congestion_start = 1
+        """).arrow()
+        con.close()
+    
+    return table.slice(0, 1).to_pylist()[0]
+
+
+def _build_key(report_path: Path) -> str:
+    """
+    Fingerprint of everything the PDF is built from: the zone summary, its
+    audit_stats rollup, the chart PNGs, this module and the PDF itself.
+    Only file sizes and mtimes are hashed, so this costs a few stat() calls.
+    """
+    inputs = [
+        AGGREGATED_DIR / "trips_by_zone_category.parquet",
+        AGGREGATED_DIR / "audit_stats.parquet",
+        Path(__file__),
+        report_path,
+    ]
+    for viz_file, _ in VIZ_FILES:
+        inputs.append(FIGURES_DIR / viz_file)
+        inputs.append(FIGURES_DIR / viz_file.replace('.png', '_embed.png'))
+    
+    key = hashlib.blake2b(digest_size=16, usedforsecurity=False)
+    for path in inputs:
+        try:
+            stat = path.stat()
+            key.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        except FileNotFoundError:
+            key.update(f"{path.name}:missing;".encode())
+    return key.hexdigest()
 
 
 def create_enhanced_audit_report():
     """
     Create comprehensive PDF audit report with visualizations.
+    
+    The build is skipped when none of its inputs (or the PDF) changed since
+    the last run; the fingerprint is kept in audit_report.pdf.key.
     """
     
     # Setup output path
     report_path = OUTPUT_DIR / "audit_report.pdf"
+    key_path = report_path.with_name(report_path.name + ".key")
+    
+    if report_path.exists() and key_path.exists() and key_path.read_text() == _build_key(report_path):
+        print(f"✅ PDF up to date: {report_path.absolute()}")
+        return report_path
     
     # Create PDF document
     doc = SimpleDocTemplate(
@@ -44,84 +270,33 @@ def create_enhanced_audit_report():
     # Container for the 'Flowable' objects
     elements = []
     
-    # Define styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1f77b4'),
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#2c3e50'),
-        spaceAfter=12,
-        spaceBefore=12,
-        fontName='Helvetica-Bold'
-    )
-    
-    subheading_style = ParagraphStyle(
-        'CustomSubHeading',
-        parent=styles['Heading3'],
-        fontSize=13,
-        textColor=colors.HexColor('#34495e'),
-        spaceAfter=8,
-        spaceBefore=8,
-        fontName='Helvetica-Bold'
-    )
-    
-    body_style = ParagraphStyle(
-        'CustomBody',
-        parent=styles['BodyText'],
-        fontSize=11,
-        alignment=TA_JUSTIFY,
-        spaceAfter=12,
-    )
-    
     # Title Page
     elements.append(Spacer(1, 2*inch))
-    elements.append(Paragraph("NYC Congestion Pricing Audit 2025", title_style))
+    elements.append(Paragraph("NYC Congestion Pricing Audit 2025", _TITLE_STYLE))
     elements.append(Spacer(1, 0.3*inch))
     elements.append(Paragraph(
         "Comprehensive Analysis of the Congestion Relief Zone Toll Effectiveness",
-        ParagraphStyle('Subtitle', parent=styles['Normal'], fontSize=14, alignment=TA_CENTER, textColor=colors.grey)
+        _SUBTITLE_STYLE
     ))
     elements.append(Spacer(1, 0.5*inch))
     elements.append(Paragraph(
         f"Report Generated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}",
-        ParagraphStyle('Date', parent=styles['Normal'], fontSize=12, alignment=TA_CENTER, textColor=colors.grey)
+        _DATE_STYLE
     ))
     elements.append(Spacer(1, 0.3*inch))
     elements.append(Paragraph(
         "Data Engineering Pipeline Analysis",
-        ParagraphStyle('Subtitle2', parent=styles['Normal'], fontSize=11, alignment=TA_CENTER, textColor=colors.grey, fontName='Helvetica-Oblique')
+        _SUBTITLE2_STYLE
     ))
     elements.append(PageBreak())
     
     # Table of Contents
-    elements.append(Paragraph("Table of Contents", heading_style))
-    toc_items = [
-        "1. Executive Summary",
-        "2. Key Findings & Statistics",
-        "3. Methodology & Data Sources",
-        "4. Analysis Pipeline",
-        "5. Visual Analysis",
-        "6. Detailed Findings",
-        "7. Policy Recommendations",
-        "8. Conclusion"
-    ]
-    for item in toc_items:
-        elements.append(Paragraph(f"&nbsp;&nbsp;&nbsp;&nbsp;{item}", body_style))
+    elements.append(Paragraph("Table of Contents", _HEADING_STYLE))
+    elements.extend(Paragraph(f"&nbsp;&nbsp;&nbsp;&nbsp;{item}", _BODY_STYLE) for item in TOC_ITEMS)
     elements.append(PageBreak())
     
     # Executive Summary
-    elements.append(Paragraph("1. Executive Summary", heading_style))
+    elements.append(Paragraph("1. Executive Summary", _HEADING_STYLE))
     elements.append(Paragraph(
         """
         This comprehensive audit analyzes the effectiveness of New York City's Congestion Relief Zone Toll, 
@@ -129,7 +304,7 @@ def create_enhanced_audit_report():
         spanning 2023-2025, we evaluated the policy's impact on traffic patterns, revenue generation, and 
         compliance rates.
         """,
-        body_style
+        _BODY_STYLE
     ))
     elements.append(Spacer(1, 0.1*inch))
     elements.append(Paragraph(
@@ -141,83 +316,45 @@ def create_enhanced_audit_report():
         • Calculated compliance rates and revenue leakage metrics<br/>
         • Integrated weather data to assess environmental impact on taxi demand
         """,
-        body_style
+        _BODY_STYLE
     ))
     elements.append(Spacer(1, 0.2*inch))
     
     # Load statistics
     try:
-        con = duckdb.connect()
-        
         # Get trip statistics
         zone_file = AGGREGATED_DIR / "trips_by_zone_category.parquet"
         if zone_file.exists():
-            stats = con.execute(f"""
-                SELECT 
-                    SUM(trip_count) as total_trips,
-                    SUM(total_congestion_collected) as total_revenue,
-                    SUM(trips_with_surcharge) as trips_with_surcharge,
-                    SUM(trips_without_surcharge) as trips_without_surcharge,
-                    AVG(avg_fare) as avg_fare,
-                    AVG(avg_distance) as avg_distance
-                FROM read_parquet('{zone_file}')
-                WHERE after_congestion_start = 1
-            """).fetchone()
+            stats = load_zone_stats(zone_file)
             
-            total_trips = stats[0] if stats[0] else 0
-            total_revenue = stats[1] if stats[1] else 0
-            trips_with = stats[2] if stats[2] else 0
-            trips_without = stats[3] if stats[3] else 0
-            avg_fare = stats[4] if stats[4] else 0
-            avg_distance = stats[5] if stats[5] else 0
+            total_trips = stats['total_trips'] or 0
+            total_revenue = stats['total_revenue'] or 0
+            trips_with = stats['trips_with_surcharge'] or 0
+            trips_without = stats['trips_without_surcharge'] or 0
+            avg_fare = stats['avg_fare'] or 0
+            avg_distance = stats['avg_distance'] or 0
             
             compliance_rate = (trips_with / (trips_with + trips_without) * 100) if (trips_with + trips_without) > 0 else 0
             leakage_rate = 100 - compliance_rate
             estimated_lost_revenue = trips_without * 2.5  # Assuming $2.50 surcharge
             
             # Key Findings Table
-            elements.append(Paragraph("2. Key Findings & Statistics", heading_style))
+            elements.append(Paragraph("2. Key Findings & Statistics", _HEADING_STYLE))
             
-            data = [
-                ['Metric', 'Value', 'Interpretation'],
-                ['Total Trips Analyzed', f'{total_trips:,.0f}', 'Post-implementation (Jan 5+)'],
-                ['Congestion Toll Revenue', f'${total_revenue:,.2f}', 'Actual revenue collected'],
-                ['Compliance Rate', f'{compliance_rate:.1f}%', 'Trips with surcharge'],
-                ['Leakage Rate', f'{leakage_rate:.1f}%', 'Trips without surcharge'],
-                ['Estimated Revenue Lost', f'${estimated_lost_revenue:,.2f}', 'Due to non-compliance'],
-                ['Average Fare', f'${avg_fare:.2f}', 'Per trip in zone'],
-                ['Average Distance', f'{avg_distance:.2f} mi', 'Per trip in zone'],
-            ]
-            
-            table = Table(data, colWidths=[2.2*inch, 1.8*inch, 2.5*inch])
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1f77b4')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 11),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ]))
-            
-            elements.append(table)
+            elements.append(_make_key_findings_table(
+                total_trips, total_revenue, compliance_rate, leakage_rate,
+                estimated_lost_revenue, avg_fare, avg_distance
+            ))
             elements.append(Spacer(1, 0.3*inch))
         
-        con.close()
-        
     except Exception as e:
-        elements.append(Paragraph(f"Note: Detailed statistics pending full data processing.", body_style))
+        elements.append(Paragraph(f"Note: Detailed statistics pending full data processing.", _BODY_STYLE))
     
     # Methodology
     elements.append(PageBreak())
-    elements.append(Paragraph("3. Methodology & Data Sources", heading_style))
+    elements.append(Paragraph("3. Methodology & Data Sources", _HEADING_STYLE))
     
-    elements.append(Paragraph("<b>Data Source</b>", subheading_style))
+    elements.append(Paragraph("<b>Data Source</b>", _SUBHEADING_STYLE))
     elements.append(Paragraph(
         """
         NYC Taxi & Limousine Commission (TLC) trip record data, publicly available at 
@@ -225,108 +362,80 @@ def create_enhanced_audit_report():
         detailed trip information for both Yellow and Green taxis, with fields including 
         pickup/dropoff times, locations, fares, and congestion surcharges.
         """,
-        body_style
+        _BODY_STYLE
     ))
     
-    elements.append(Paragraph("<b>Time Period</b>", subheading_style))
+    elements.append(Paragraph("<b>Time Period</b>", _SUBHEADING_STYLE))
     elements.append(Paragraph(
         """
         Analysis covers January 2023 through January 2025, with specific focus on the period 
         before and after the congestion pricing implementation date (January 5, 2025). This 
         timeframe allows for year-over-year comparisons and trend analysis.
         """,
-        body_style
+        _BODY_STYLE
     ))
     
-    elements.append(Paragraph("<b>Processing Technology</b>", subheading_style))
+    elements.append(Paragraph("<b>Processing Technology</b>", _SUBHEADING_STYLE))
     elements.append(Paragraph(
         """
         DuckDB was selected as the primary data processing engine due to its out-of-core processing 
         capabilities, which enable handling of datasets larger than available RAM. This approach 
         adheres to big data best practices by never loading the full 50+ GB dataset into memory.
         """,
-        body_style
+        _BODY_STYLE
     ))
     
-    elements.append(Paragraph("<b>Congestion Zone Definition</b>", subheading_style))
+    elements.append(Paragraph("<b>Congestion Zone Definition</b>", _SUBHEADING_STYLE))
     elements.append(Paragraph(
         """
         The Congestion Relief Zone encompasses Manhattan south of 60th Street, including major 
         business districts, tourist areas, and residential neighborhoods. Zone boundaries were 
         validated using official TLC taxi zone shapefiles.
         """,
-        body_style
+        _BODY_STYLE
     ))
     
     # Analysis Pipeline
     elements.append(PageBreak())
-    elements.append(Paragraph("4. Analysis Pipeline", heading_style))
+    elements.append(Paragraph("4. Analysis Pipeline", _HEADING_STYLE))
     
     elements.append(Paragraph(
         """
         The analysis follows a rigorous 9-phase pipeline designed for reproducibility and scalability:
         """,
-        body_style
+        _BODY_STYLE
     ))
     
-    phases = [
-        ['Phase', 'Description', 'Output'],
-        ['1. Data Ingestion', 'Automated download of 72 TLC parquet files (~50 GB) with retry logic and validation', 'Raw parquet files'],
-        ['2. Schema Unification', 'Mapped Yellow and Green taxi columns to unified schema using DuckDB', 'Unified dataset'],
-        ['3. Ghost Trip Detection', 'Identified fraudulent/erroneous records using 5 detection rules', 'Clean dataset + audit trail'],
-        ['4. Missing Data Imputation', 'Handled missing December 2025 data using weighted average (70% Dec 2024, 30% Dec 2023)', 'Complete dataset'],
-        ['5. Zone Filtering', 'Classified trips by congestion zone category using geospatial analysis', 'Zone-categorized trips'],
-        ['6. Leakage Analysis', 'Calculated compliance rates and revenue leakage', 'Compliance metrics'],
-        ['7. Comparative Analysis', 'Yellow vs Green taxi behavior before/after implementation', 'Comparison statistics'],
-        ['8. Visualization', 'Created matplotlib charts (300 DPI PNG images)', '4 visualizations'],
-        ['9. Weather Integration', 'Analyzed weather impact using Meteostat API', 'Weather correlations'],
-    ]
-    
-    phase_table = Table(phases, colWidths=[0.8*inch, 3.2*inch, 2.5*inch])
-    phase_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-    ]))
-    
-    elements.append(phase_table)
+    elements.append(_make_phase_table())
     elements.append(Spacer(1, 0.3*inch))
     
     # Visual Analysis with embedded images
     elements.append(PageBreak())
-    elements.append(Paragraph("5. Visual Analysis", heading_style))
+    elements.append(Paragraph("5. Visual Analysis", _HEADING_STYLE))
     
     # Add visualizations
-    viz_files = [
-        ("time_series_trips.png", "Daily Trip Volume Trends"),
-        ("revenue_analysis.png", "Revenue Growth Analysis"),
-        ("zone_category_distribution.png", "Zone Category Distribution"),
-        ("leakage_analysis.png", "Compliance and Leakage Tracking")
-    ]
-    
-    for viz_file, viz_title in viz_files:
+    for viz_file, viz_title in VIZ_FILES:
         viz_path = FIGURES_DIR / viz_file
         if viz_path.exists():
-            elements.append(Paragraph(f"<b>{viz_title}</b>", subheading_style))
+            elements.append(Paragraph(f"<b>{viz_title}</b>", _SUBHEADING_STYLE))
+            
+            # Prefer the report-sized copy Phase 8 writes next to the
+            # 300 DPI master (charts from older runs only have the master)
+            embed_file = FIGURES_DIR / viz_file.replace('.png', '_embed.png')
+            if embed_file.exists():
+                viz_path = embed_file
             
-            # Add image (scaled to fit page)
-            img = RLImage(str(viz_path), width=6*inch, height=3*inch)
+            # Add image (scaled to fit page); lazy=2 opens the PNG only
+            # while it is drawn, so the four charts aren't held in memory
+            img = RLImage(str(viz_path), width=6*inch, height=3*inch, lazy=2)
             elements.append(img)
             elements.append(Spacer(1, 0.2*inch))
     
     # Detailed Findings
     elements.append(PageBreak())
-    elements.append(Paragraph("6. Detailed Findings", heading_style))
+    elements.append(Paragraph("6. Detailed Findings", _HEADING_STYLE))
     
-    elements.append(Paragraph("<b>Ghost Trip Detection Results</b>", subheading_style))
+    elements.append(Paragraph("<b>Ghost Trip Detection Results</b>", _SUBHEADING_STYLE))
     elements.append(Paragraph(
         """
         The analysis identified 144,387 ghost trips (approximately 4.2% of total records) using 
@@ -334,10 +443,10 @@ def create_enhanced_audit_report():
         zero distance with positive fare, negative trip duration, and negative fares. These records 
         were flagged and logged separately to maintain an audit trail while ensuring data quality.
         """,
-        body_style
+        _BODY_STYLE
     ))
     
-    elements.append(Paragraph("<b>Compliance Analysis</b>", subheading_style))
+    elements.append(Paragraph("<b>Compliance Analysis</b>", _SUBHEADING_STYLE))
     elements.append(Paragraph(
         """
         Compliance rate analysis reveals that a significant portion of trips within the congestion 
@@ -345,40 +454,33 @@ def create_enhanced_audit_report():
         for improved enforcement and collection mechanisms. Geographic analysis of leakage patterns 
         can inform targeted enforcement strategies.
         """,
-        body_style
+        _BODY_STYLE
     ))
     
-    elements.append(Paragraph("<b>Weather Impact</b>", subheading_style))
+    elements.append(Paragraph("<b>Weather Impact</b>", _SUBHEADING_STYLE))
     elements.append(Paragraph(
         """
         Integration of weather data from Meteostat revealed correlations between precipitation and 
         taxi demand. Rainy days showed increased trip volumes and higher average fares, suggesting 
         a "rain tax" effect where passengers are willing to pay premium prices during inclement weather.
         """,
-        body_style
+        _BODY_STYLE
     ))
     
     # Policy Recommendations
     elements.append(PageBreak())
-    elements.append(Paragraph("7. Policy Recommendations", heading_style))
-    
-    recommendations = [
-        ("Enhance Enforcement", "Implement real-time monitoring systems to identify and address non-compliance patterns. Focus enforcement efforts on high-leakage pickup locations."),
-        ("Dynamic Pricing", "Consider weather-adjusted pricing strategies to optimize revenue during high-demand periods while maintaining affordability during normal conditions."),
-        ("Technology Integration", "Mandate automated surcharge collection systems in all TLC-licensed vehicles to reduce human error and intentional non-compliance."),
-        ("Expand Zone Coverage", "Based on effectiveness metrics, evaluate gradual expansion of the congestion zone to additional high-traffic areas."),
-        ("Public Transparency", "Establish a public dashboard showing real-time compliance rates and revenue collection to build public trust and accountability."),
-        ("Data-Driven Adjustments", "Conduct quarterly reviews of pricing and zone boundaries using data analytics to ensure policy objectives are met."),
-    ]
+    elements.append(Paragraph("7. Policy Recommendations", _HEADING_STYLE))
     
-    for i, (title, desc) in enumerate(recommendations, 1):
-        elements.append(Paragraph(f"<b>{i}. {title}</b>", subheading_style))
-        elements.append(Paragraph(desc, body_style))
-        elements.append(Spacer(1, 0.1*inch))
+    for i, (title, desc) in enumerate(RECOMMENDATIONS, 1):
+        elements.extend([
+            Paragraph(f"<b>{i}. {title}</b>", _SUBHEADING_STYLE),
+            Paragraph(desc, _BODY_STYLE),
+            Spacer(1, 0.1*inch),
+        ])
     
     # Conclusion
     elements.append(PageBreak())
-    elements.append(Paragraph("8. Conclusion", heading_style))
+    elements.append(Paragraph("8. Conclusion", _HEADING_STYLE))
     elements.append(Paragraph(
         """
         The NYC Congestion Relief Zone Toll has demonstrated measurable impact on traffic patterns 
@@ -386,14 +488,14 @@ def create_enhanced_audit_report():
         powered by big data processing techniques and rigorous statistical methods, provides actionable 
         insights for policy refinement.
         """,
-        body_style
+        _BODY_STYLE
     ))
     elements.append(Spacer(1, 0.1*inch))
     elements.append(Paragraph(
         """
         Key achievements of this analysis include:
         """,
-        body_style
+        _BODY_STYLE
     ))
     elements.append(Paragraph(
         """
@@ -403,7 +505,7 @@ def create_enhanced_audit_report():
         • <b>Reproducibility:</b> Automated pipeline ensures consistent, repeatable analysis<br/>
         • <b>Multi-dimensional Analysis:</b> Integrated weather, geographic, and temporal factors
         """,
-        body_style
+        _BODY_STYLE
     ))
     elements.append(Spacer(1, 0.2*inch))
     elements.append(Paragraph(
@@ -413,7 +515,7 @@ def create_enhanced_audit_report():
         report provide a roadmap for optimizing the congestion pricing program to better serve 
         New York City's transportation and environmental goals.
         """,
-        body_style
+        _BODY_STYLE
     ))
     elements.append(Spacer(1, 0.2*inch))
     elements.append(Paragraph(
@@ -422,26 +524,27 @@ def create_enhanced_audit_report():
         and policy evaluation. The methodologies and tools developed for this audit can be applied 
         to future policy assessments and ongoing monitoring of the congestion pricing program.
         """,
-        body_style
+        _BODY_STYLE
     ))
     
     # Footer
     elements.append(Spacer(1, 0.5*inch))
     elements.append(Paragraph(
         "─" * 80,
-        ParagraphStyle('Line', parent=styles['Normal'], alignment=TA_CENTER, fontSize=8)
+        _LINE_STYLE
     ))
     elements.append(Paragraph(
         "For interactive visualizations and real-time data exploration, see the Python Dashboard Application",
-        ParagraphStyle('Footer', parent=styles['Normal'], fontSize=9, alignment=TA_CENTER, textColor=colors.grey)
+        _FOOTER_STYLE
     ))
     elements.append(Paragraph(
         f"Report generated using DuckDB, Matplotlib, and ReportLab | {datetime.now().strftime('%Y')}",
-        ParagraphStyle('Footer2', parent=styles['Normal'], fontSize=8, alignment=TA_CENTER, textColor=colors.grey, fontName='Helvetica-Oblique')
+        _FOOTER2_STYLE
     ))
     
     # Build PDF
     doc.build(elements)
+    key_path.write_text(_build_key(report_path))
     
     print(f"✅ Enhanced PDF Report created: {report_path.absolute()}")
     return report_path
@@ -21,20 +21,61 @@ How it works:
 """
 
 import duckdb
+import hashlib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from loguru import logger
 import sys
 
 from .config import (
     YELLOW_RAW_DIR, GREEN_RAW_DIR,
     UNIFIED_DIR, YELLOW_COLUMN_MAP, GREEN_COLUMN_MAP,
-    UNIFIED_SCHEMA, LOGS_DIR
+    UNIFIED_SCHEMA, MANIFEST_FILE, LOGS_DIR, configure_logging, connect
 )
 
-# Setup logging
-logger.remove()
-logger.add(sys.stderr, format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}")
-logger.add(LOGS_DIR / "schema.log", rotation="10 MB")
+# One connection per process, reused for every file that process unifies
+_CON = None
+
+
+def get_connection(threads: int = None) -> duckdb.DuckDBPyConnection:
+    """
+    Return this process's DuckDB connection, creating it on first use.
+    
+    Args:
+        threads: Optional thread cap (overrides DUCKDB_THREADS)
+    """
+    
+    global _CON
+    
+    if _CON is None:
+        _CON = connect(threads)
+    elif threads:
+        _CON.execute(f"SET threads={threads}")
+    
+    return _CON
+
+
+# Cast applied to each unified column ({col} = original column name)
+_CAST_EXPRESSIONS = {
+    # Datetime columns
+    'pickup_time': "CAST({col} AS TIMESTAMP)",
+    'dropoff_time': "CAST({col} AS TIMESTAMP)",
+    # Location IDs
+    'pickup_loc': "CAST({col} AS INTEGER)",
+    'dropoff_loc': "CAST({col} AS INTEGER)",
+    # Numeric columns
+    'trip_distance': "CAST({col} AS DOUBLE)",
+    'fare': "CAST({col} AS DOUBLE)",
+    'total_amount': "CAST({col} AS DOUBLE)",
+    # Missing surcharge means none was charged: store 0 so readers can
+    # aggregate the column without a COALESCE per row
+    'congestion_surcharge': "COALESCE(CAST({col} AS DOUBLE), 0.0)",
+}
 
 
 def build_select_query(column_map: dict, taxi_type: str) -> str:
@@ -56,32 +97,25 @@ def build_select_query(column_map: dict, taxi_type: str) -> str:
                       tpep_dropoff_datetime AS dropoff_time, ...
     """
     
+    # Invert the map once (unified -> original) so each column is a dict lookup
+    original_for = {v: k for k, v in column_map.items()}
     select_parts = []
     
     for unified_col in UNIFIED_SCHEMA:
-        if unified_col in column_map.values():
-            # Find original column name
-            original_col = [k for k, v in column_map.items() if v == unified_col][0]
-            
-            # Add type casting for datetime columns
-            if 'time' in unified_col:
-                select_parts.append(f"CAST({original_col} AS TIMESTAMP) AS {unified_col}")
-            # Add type casting for numeric columns
-            elif unified_col in ['trip_distance', 'fare', 'total_amount', 'congestion_surcharge']:
-                select_parts.append(f"CAST({original_col} AS DOUBLE) AS {unified_col}")
-            # Add type casting for location IDs
-            elif 'loc' in unified_col:
-                select_parts.append(f"CAST({original_col} AS INTEGER) AS {unified_col}")
-            else:
-                select_parts.append(f"{original_col} AS {unified_col}")
+        original_col = original_for.get(unified_col)
+        
+        if original_col is not None:
+            select_parts.append(_CAST_EXPRESSIONS.get(unified_col, "{col}").format(col=original_col) + f" AS {unified_col}")
         else:
-            # Column doesn't exist in this taxi type, use NULL
-            select_parts.append(f"NULL AS {unified_col}")
+            # Column doesn't exist in this taxi type, use NULL (0 for surcharge)
+            default = "0.0" if unified_col == 'congestion_surcharge' else "NULL"
+            select_parts.append(f"{default} AS {unified_col}")
     
     return "SELECT " + ",\n       ".join(select_parts)
 
 
-def unify_file(input_path: Path, output_path: Path, column_map: dict, taxi_type: str) -> bool:
+def unify_file(input_path: Path, output_path: Path, column_map: dict, taxi_type: str,
+               threads: int = None) -> bool:
     """
     Unify a single parquet file to the common schema.
     
@@ -90,6 +124,7 @@ def unify_file(input_path: Path, output_path: Path, column_map: dict, taxi_type:
         output_path: Path to save unified parquet file
         column_map: Column mapping dictionary
         taxi_type: 'yellow' or 'green'
+        threads: DuckDB thread cap (set when several files run in parallel)
     
     Returns:
         True if successful, False otherwise
@@ -103,13 +138,15 @@ def unify_file(input_path: Path, output_path: Path, column_map: dict, taxi_type:
     try:
         logger.info(f"Unifying {input_path.name}...")
         
-        # Create DuckDB connection (in-memory database)
-        con = duckdb.connect()
+        # Shared per-process DuckDB connection (in-memory database)
+        con = get_connection(threads)
         
         # Build SELECT query
         select_query = build_select_query(column_map, taxi_type)
         
         # Full query: read parquet, transform, write parquet
+        # (SNAPPY: unified files are an intermediate read once by Phase 3,
+        # so encode speed matters more than size)
         query = f"""
         COPY (
             {select_query}
@@ -119,19 +156,15 @@ def unify_file(input_path: Path, output_path: Path, column_map: dict, taxi_type:
               AND pickup_loc IS NOT NULL
               AND dropoff_loc IS NOT NULL
         )
-        TO '{output_path}' (FORMAT PARQUET, COMPRESSION ZSTD)
+        TO '{output_path}' (FORMAT PARQUET, COMPRESSION SNAPPY)
         """
         
-        # Execute query
-        con.execute(query)
-        
-        # Get row count
-        result = con.execute(f"SELECT COUNT(*) FROM read_parquet('{output_path}')").fetchone()
-        row_count = result[0]
+        # Execute query; COPY returns the number of rows it wrote, so the
+        # output doesn't have to be scanned again to count them
+        row_count = con.execute(query).fetchone()[0]
         
         logger.success(f"Unified {input_path.name}: {row_count:,} rows")
         
-        con.close()
         return True
         
     except Exception as e:
@@ -139,10 +172,15 @@ def unify_file(input_path: Path, output_path: Path, column_map: dict, taxi_type:
         return False
 
 
-def unify_all_files() -> dict:
+def unify_all_files(skip_existing: bool = True) -> dict:
     """
     Unify all Yellow and Green taxi files.
     
+    Args:
+        skip_existing: Skip raw files that already have a unified output.
+                       Pass False to re-unify everything (e.g. after the
+                       column maps or casts changed)
+    
     Returns:
         Dictionary with unification statistics
     
@@ -167,41 +205,52 @@ def unify_all_files() -> dict:
     # Create output directory
     UNIFIED_DIR.mkdir(parents=True, exist_ok=True)
     
-    # Unify Yellow taxi files
-    logger.info("\nUnifying Yellow Taxi Files...")
-    yellow_files = sorted(YELLOW_RAW_DIR.glob("*.parquet"))
+    # Collect pending files for both taxi types. The unified directory is
+    # listed once up front so the skip check is a set lookup, not a stat()
+    # per raw file
+    jobs = []
+    already_unified = {entry.name for entry in os.scandir(UNIFIED_DIR)}
     
-    for input_path in yellow_files:
-        output_path = UNIFIED_DIR / f"yellow_unified_{input_path.name}"
-        
-        # Skip if already exists
-        if output_path.exists():
-            logger.info(f"Skipping {input_path.name} (already unified)")
-            stats['yellow_unified'] += 1
-            continue
-        
-        if unify_file(input_path, output_path, YELLOW_COLUMN_MAP, 'yellow'):
-            stats['yellow_unified'] += 1
-        else:
-            stats['yellow_failed'] += 1
-    
-    # Unify Green taxi files
-    logger.info("\nUnifying Green Taxi Files...")
-    green_files = sorted(GREEN_RAW_DIR.glob("*.parquet"))
+    for color, raw_dir, column_map in [
+        ('yellow', YELLOW_RAW_DIR, YELLOW_COLUMN_MAP),
+        ('green', GREEN_RAW_DIR, GREEN_COLUMN_MAP),
+    ]:
+        for input_path in sorted(raw_dir.glob("*.parquet")):
+            output_path = UNIFIED_DIR / f"{color}_unified_{input_path.name}"
+            
+            # Skip if already exists
+            if skip_existing and output_path.name in already_unified:
+                logger.info(f"Skipping {input_path.name} (already unified)")
+                stats[f'{color}_unified'] += 1
+                continue
+            
+            jobs.append((color, input_path, output_path, column_map))
     
-    for input_path in green_files:
-        output_path = UNIFIED_DIR / f"green_unified_{input_path.name}"
+    # Each file is independent, so unify them in parallel processes
+    if jobs:
+        logger.info(f"\nUnifying {len(jobs)} files...")
         
-        # Skip if already exists
-        if output_path.exists():
-            logger.info(f"Skipping {input_path.name} (already unified)")
-            stats['green_unified'] += 1
-            continue
+        # Half the cores as worker processes, the other half shared out as
+        # DuckDB threads per worker, so workers x threads ~= cores instead
+        # of every process starting one DuckDB thread per core
+        cpu_count = os.cpu_count() or 1
+        workers = min(max(cpu_count // 2, 1), len(jobs))
+        threads_per_worker = max(cpu_count // workers, 1)
         
-        if unify_file(input_path, output_path, GREEN_COLUMN_MAP, 'green'):
-            stats['green_unified'] += 1
-        else:
-            stats['green_failed'] += 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(unify_file, input_path, output_path, column_map, color, threads_per_worker): color
+                for color, input_path, output_path, column_map in jobs
+            }
+            
+            for future in as_completed(futures):
+                color = futures[future]
+                if future.result():
+                    stats[f'{color}_unified'] += 1
+                else:
+                    stats[f'{color}_failed'] += 1
+    
+    update_manifest('unified')
     
     # Print summary
     logger.info("\n" + "=" * 60)
@@ -217,6 +266,95 @@ def unify_all_files() -> dict:
     return stats
 
 
+def update_manifest(stage: str) -> int:
+    """
+    Record the current files of one processing stage in the manifest.
+    
+    Args:
+        stage: 'unified' (Phase 2 output) or 'clean' (Phase 3 output)
+    
+    Returns:
+        Number of files recorded for the stage
+    
+    Why a manifest?
+    - Downstream phases need "Yellow files for Q1 2024", not a directory listing
+    - One small parquet read replaces a glob + stat per file in every phase
+    - schema_hash lets readers spot files written with a different schema
+    
+    Rows of other stages are kept, so Phase 2 and Phase 3 share one file.
+    """
+    
+    name_pattern = re.compile(rf"^(yellow|green)_{stage}_.*_(\d{{4}})-(\d{{2}})\.parquet$")
+    rows = []
+    
+    for path in sorted(UNIFIED_DIR.glob(f"*_{stage}_*.parquet")):
+        match = name_pattern.match(path.name)
+        if not match:
+            continue
+        
+        color, year, month = match.groups()
+        schema = pq.read_schema(path)
+        
+        rows.append({
+            'stage': stage,
+            'path': str(path),
+            'taxi_type': color,
+            'year': int(year),
+            'month': int(month),
+            'size': path.stat().st_size,
+            'schema_hash': hashlib.blake2b(str(schema.remove_metadata()).encode(), digest_size=8).hexdigest()
+        })
+    
+    manifest = pa.Table.from_pylist(rows, schema=pa.schema([
+        ('stage', pa.string()), ('path', pa.string()), ('taxi_type', pa.string()),
+        ('year', pa.int32()), ('month', pa.int32()), ('size', pa.int64()), ('schema_hash', pa.string())
+    ]))
+    
+    if MANIFEST_FILE.exists():
+        existing = pq.read_table(MANIFEST_FILE)
+        existing = existing.filter(pc.not_equal(existing['stage'], stage))
+        manifest = pa.concat_tables([existing, manifest.cast(existing.schema)])
+    
+    MANIFEST_FILE.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(manifest, MANIFEST_FILE)
+    
+    logger.info(f"Manifest updated: {len(rows)} {stage} files")
+    return len(rows)
+
+
+def manifest_files(stage: str, taxi_type: str = None, year: int = None, months: list = None) -> list:
+    """
+    Paths of the manifest's files for one stage, pruned by taxi type/year/month.
+    
+    Args:
+        stage: 'unified' or 'clean'
+        taxi_type: Optional 'yellow' or 'green'
+        year: Optional year
+        months: Optional list of months
+    
+    Returns:
+        List of file paths (empty if the manifest doesn't exist yet)
+    
+    This is the pipeline's partition index: a reader asks for exactly the
+    months it needs instead of globbing every file and filtering rows.
+    """
+    
+    if not MANIFEST_FILE.exists():
+        return []
+    
+    manifest = pq.read_table(MANIFEST_FILE, columns=['stage', 'path', 'taxi_type', 'year', 'month'])
+    mask = pc.equal(manifest['stage'], stage)
+    
+    if taxi_type is not None:
+        mask = pc.and_(mask, pc.equal(manifest['taxi_type'], taxi_type))
+    if year is not None:
+        mask = pc.and_(mask, pc.equal(manifest['year'], year))
+    if months is not None:
+        mask = pc.and_(mask, pc.is_in(manifest['month'], value_set=pa.array(months, pa.int32())))
+    
+    return manifest.filter(mask)['path'].to_pylist()
+
+
 def verify_unified_schema(file_path: Path) -> bool:
     """
     Verify that a unified file has the correct schema.
@@ -229,20 +367,17 @@ def verify_unified_schema(file_path: Path) -> bool:
     """
     
     try:
-        con = duckdb.connect()
-        
-        # Get column names
-        result = con.execute(f"DESCRIBE SELECT * FROM read_parquet('{file_path}')").fetchall()
-        column_names = [row[0] for row in result]
+        # The schema lives in the parquet footer, so read just that rather
+        # than spinning up a DuckDB connection to DESCRIBE the file
+        column_names = set(pq.read_schema(file_path).names)
         
         # Check if all expected columns exist
-        for expected_col in UNIFIED_SCHEMA:
-            if expected_col not in column_names:
-                logger.error(f"Missing column {expected_col} in {file_path.name}")
-                return False
+        missing = [col for col in UNIFIED_SCHEMA if col not in column_names]
+        if missing:
+            logger.error(f"Missing column(s) {', '.join(missing)} in {file_path.name}")
+            return False
         
         logger.success(f"Schema verified for {file_path.name}")
-        con.close()
         return True
         
     except Exception as e:
@@ -264,6 +399,12 @@ if __name__ == "__main__":
     Time: ~10-20 minutes depending on data size
     """
     
+    # Per-file progress goes to the log file through a background queue so
+    # unify_file never waits on the write; the console only echoes warnings
+    # and errors unless VERBOSE is set
+    configure_logging(LOGS_DIR / "schema.log", rotation="10 MB", enqueue=True,
+                      console_level="INFO" if os.environ.get("VERBOSE") else "WARNING")
+    
     # Unify all files
     stats = unify_all_files()
     
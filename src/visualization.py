@@ -2,7 +2,7 @@
 PHASE 8: Visual Audit (Matplotlib Version)
 ===========================================
 
-This module generates static charts using matplotlib and seaborn.
+This module generates static charts using matplotlib.
 
 Visualizations:
 1. Time Series - Trip volume over time
@@ -14,8 +14,13 @@ Output: PNG images (high resolution, 300 DPI)
 """
 
 import duckdb
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+matplotlib.use('Agg')  # file output only, never a GUI backend
 import matplotlib.pyplot as plt
-import seaborn as sns
+from matplotlib.ticker import StrMethodFormatter
 from pathlib import Path
 from loguru import logger
 import sys
@@ -23,49 +28,98 @@ import pandas as pd
 import numpy as np
 
 from src.config import (
-    AGGREGATED_DIR, FIGURES_DIR, LOGS_DIR,
+    AGGREGATED_DIR, FIGURES_DIR, LOGS_DIR, configure_logging,
     COLOR_YELLOW, COLOR_GREEN, COLOR_CONGESTION,
-    FIGURE_WIDTH, FIGURE_HEIGHT
+    FIGURE_WIDTH, FIGURE_HEIGHT, connect
 )
 
-# Setup logging
-logger.remove()
-logger.add(sys.stderr, format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}")
-logger.add(LOGS_DIR / "visualization.log", rotation="10 MB")
+# Matplotlib style: the darkgrid look, set directly. Every chart picks its
+# own colours, so seaborn's style file and palette aren't needed
+plt.rcParams.update({
+    'axes.facecolor': '#EAEAF2',
+    'axes.edgecolor': 'white',
+    'axes.linewidth': 0,
+    'axes.grid': True,
+    'axes.axisbelow': True,
+    'grid.color': 'white',
+    'grid.linestyle': '-',
+    'figure.facecolor': 'white',
+    'xtick.bottom': False,
+    'ytick.left': False,
+})
 
-# Set matplotlib style
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
-
-# DPI for high-quality images
+# DPI for high-quality images. Applied only when saving: figures are drawn
+# at matplotlib's default DPI and rasterised at DPI/EMBED_DPI by savefig
 DPI = 300
 FIGSIZE = (12, 6)
 
+# The audit report embeds each chart in a 6x3 inch slot, so it gets its own
+# copy at ~200 DPI of that slot (a 12-inch figure saved at 100 DPI) instead
+# of carrying the 300 DPI master's pixels into the PDF
+EMBED_DPI = 100
+
+
+def embed_path(output_path: Path) -> Path:
+    """
+    Path of the report-sized copy of a chart (name_embed.png).
+    """
+    return output_path.with_name(f"{output_path.stem}_embed.png")
+
 
-def create_time_series_chart() -> None:
+def save_figure(output_path: Path) -> None:
+    """
+    Save the current figure as the 300 DPI master plus the report-sized copy.
+    """
+    plt.savefig(output_path, dpi=DPI, bbox_inches='tight')
+    plt.savefig(embed_path(output_path), dpi=EMBED_DPI, bbox_inches='tight')
+
+
+def fetch_all_chart_data(con: duckdb.DuckDBPyConnection) -> tuple:
+    """
+    Read everything the four charts need from the Phase 5 rollups.
+    
+    Returns:
+        (daily, categories): daily_summary.parquet (one row per day) for the
+        time series, revenue and leakage charts, and the per-category totals
+        from dashboard_summary.parquet for the zone category chart
+    
+    Both files are a few hundred rows at most, so the charts never touch the
+    per-category daily file.
+    
+    Args:
+        con: DuckDB connection
+    """
+    
+    daily = con.execute(f"""
+        SELECT * FROM read_parquet('{AGGREGATED_DIR}/daily_summary.parquet')
+        ORDER BY trip_date
+    """).df()
+    
+    categories = con.execute(f"""
+        SELECT zone_category, after_congestion_start, trips as total_trips
+        FROM read_parquet('{AGGREGATED_DIR}/dashboard_summary.parquet')
+        ORDER BY zone_category, after_congestion_start
+    """).df()
+    
+    return daily, categories
+
+
+def create_time_series_chart(df: pd.DataFrame) -> bool:
     """
     Create time series chart showing trip volume over time.
+    
+    Args:
+        df: Daily summary from fetch_all_chart_data()
+    
+    Returns:
+        True if the chart was saved, False otherwise
     """
     
     try:
         logger.info("Creating time series chart...")
         
-        con = duckdb.connect()
-        
-        # Aggregate daily trips
-        query = f"""
-        SELECT 
-            trip_date,
-            SUM(trip_count) as total_trips
-        FROM read_parquet('{AGGREGATED_DIR}/trips_by_zone_category.parquet')
-        GROUP BY trip_date
-        ORDER BY trip_date
-        """
-        
-        df = con.execute(query).df()
-        
         # Create figure
-        fig, ax = plt.subplots(figsize=FIGSIZE, dpi=DPI)
+        fig, ax = plt.subplots(figsize=FIGSIZE)
         
         # Plot line chart
         ax.plot(df['trip_date'], df['total_trips'], 
@@ -78,7 +132,7 @@ def create_time_series_chart() -> None:
         ax.grid(True, alpha=0.3)
         
         # Format y-axis with thousands separator
-        ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{int(x):,}'))
+        ax.yaxis.set_major_formatter(StrMethodFormatter('{x:,.0f}'))
         
         # Rotate x-axis labels
         plt.xticks(rotation=45, ha='right')
@@ -88,59 +142,55 @@ def create_time_series_chart() -> None:
         
         # Save
         output_path = FIGURES_DIR / "time_series_trips.png"
-        plt.savefig(output_path, dpi=DPI, bbox_inches='tight')
+        save_figure(output_path)
         plt.close()
         
         logger.success(f"Saved time series chart to {output_path}")
-        
-        con.close()
+        return True
         
     except Exception as e:
         logger.error(f"Failed to create time series chart: {e}")
+        return False
 
 
-def create_revenue_chart() -> None:
+def create_revenue_chart(df: pd.DataFrame) -> bool:
     """
     Create revenue analysis chart.
+    
+    Args:
+        df: Daily summary from fetch_all_chart_data()
+    
+    Returns:
+        True if the chart was saved, False otherwise
     """
     
     try:
         logger.info("Creating revenue chart...")
         
-        con = duckdb.connect()
-        
-        # Aggregate daily revenue
-        query = f"""
-        SELECT 
-            trip_date,
-            SUM(total_congestion_collected) as daily_revenue
-        FROM read_parquet('{AGGREGATED_DIR}/trips_by_zone_category.parquet')
-        WHERE after_congestion_start = 1
-        GROUP BY trip_date
-        ORDER BY trip_date
-        """
-        
-        df = con.execute(query).df()
-        df['cumulative_revenue'] = df['daily_revenue'].cumsum()
+        # Daily revenue since the toll started, as plain arrays
+        after = df['after_congestion_start'].to_numpy() == 1
+        dates = df['trip_date'].to_numpy()[after]
+        daily_revenue = df['daily_revenue'].to_numpy()[after]
+        cumulative_revenue = np.cumsum(daily_revenue)
         
         # Create figure with dual y-axis
-        fig, ax1 = plt.subplots(figsize=FIGSIZE, dpi=DPI)
+        fig, ax1 = plt.subplots(figsize=FIGSIZE)
         
         # Bar chart for daily revenue
-        ax1.bar(df['trip_date'], df['daily_revenue'], 
+        ax1.bar(dates, daily_revenue, 
                 color='#2ECC71', alpha=0.7, label='Daily Revenue')
         ax1.set_xlabel('Date', fontsize=12, fontweight='bold')
         ax1.set_ylabel('Daily Revenue ($)', fontsize=12, fontweight='bold', color='#2ECC71')
         ax1.tick_params(axis='y', labelcolor='#2ECC71')
-        ax1.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${int(x):,}'))
+        ax1.yaxis.set_major_formatter(StrMethodFormatter('${x:,.0f}'))
         
         # Line chart for cumulative revenue
         ax2 = ax1.twinx()
-        ax2.plot(df['trip_date'], df['cumulative_revenue'], 
+        ax2.plot(dates, cumulative_revenue, 
                 color='#E74C3C', linewidth=3, marker='o', markersize=5, label='Cumulative Revenue')
         ax2.set_ylabel('Cumulative Revenue ($)', fontsize=12, fontweight='bold', color='#E74C3C')
         ax2.tick_params(axis='y', labelcolor='#E74C3C')
-        ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${int(x):,}'))
+        ax2.yaxis.set_major_formatter(StrMethodFormatter('${x:,.0f}'))
         
         # Title
         ax1.set_title('Congestion Toll Revenue Analysis', fontsize=16, fontweight='bold', pad=20)
@@ -161,55 +211,49 @@ def create_revenue_chart() -> None:
         
         # Save
         output_path = FIGURES_DIR / "revenue_analysis.png"
-        plt.savefig(output_path, dpi=DPI, bbox_inches='tight')
+        save_figure(output_path)
         plt.close()
         
         logger.success(f"Saved revenue chart to {output_path}")
-        
-        con.close()
+        return True
         
     except Exception as e:
         logger.error(f"Failed to create revenue chart: {e}")
+        return False
 
 
-def create_zone_category_chart() -> None:
+def create_zone_category_chart(df: pd.DataFrame) -> bool:
     """
     Create chart showing trip distribution by zone category.
+    
+    Args:
+        df: Per-category totals from fetch_all_chart_data()
+    
+    Returns:
+        True if the chart was saved, False otherwise
     """
     
     try:
         logger.info("Creating zone category chart...")
         
-        con = duckdb.connect()
-        
-        # Aggregate by zone category
-        query = f"""
-        SELECT 
-            zone_category,
-            CASE WHEN after_congestion_start = 1 THEN 'After Jan 5' ELSE 'Before Jan 5' END as period,
-            SUM(trip_count) as total_trips
-        FROM read_parquet('{AGGREGATED_DIR}/trips_by_zone_category.parquet')
-        GROUP BY zone_category, period
-        ORDER BY zone_category, period
-        """
-        
-        df = con.execute(query).df()
+        # One row per category, one column per period (0 = before Jan 5,
+        # 1 = after); a period missing for a category becomes 0
+        pivot = (df.pivot_table(index='zone_category', columns='after_congestion_start',
+                                values='total_trips', aggfunc='sum', fill_value=0)
+                   .reindex(columns=[0, 1], fill_value=0))
         
         # Create grouped bar chart
-        fig, ax = plt.subplots(figsize=FIGSIZE, dpi=DPI)
+        fig, ax = plt.subplots(figsize=FIGSIZE)
         
         # Prepare data for grouped bars
-        categories = df['zone_category'].unique()
+        categories = pivot.index.to_numpy()
         x = np.arange(len(categories))
         width = 0.35
         
-        before_data = df[df['period'] == 'Before Jan 5'].set_index('zone_category')['total_trips']
-        after_data = df[df['period'] == 'After Jan 5'].set_index('zone_category')['total_trips']
-        
         # Create bars
-        ax.bar(x - width/2, [before_data.get(cat, 0) for cat in categories], 
+        ax.bar(x - width/2, pivot[0].to_numpy(), 
                width, label='Before Jan 5', color='#FFD700', alpha=0.8)
-        ax.bar(x + width/2, [after_data.get(cat, 0) for cat in categories], 
+        ax.bar(x + width/2, pivot[1].to_numpy(), 
                width, label='After Jan 5', color='#E74C3C', alpha=0.8)
         
         # Formatting
@@ -218,7 +262,7 @@ def create_zone_category_chart() -> None:
         ax.set_ylabel('Total Trips', fontsize=12, fontweight='bold')
         ax.set_xticks(x)
         ax.set_xticklabels(categories, rotation=45, ha='right')
-        ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{int(x):,}'))
+        ax.yaxis.set_major_formatter(StrMethodFormatter('{x:,.0f}'))
         ax.legend()
         ax.grid(True, alpha=0.3, axis='y')
         
@@ -227,56 +271,52 @@ def create_zone_category_chart() -> None:
         
         # Save
         output_path = FIGURES_DIR / "zone_category_distribution.png"
-        plt.savefig(output_path, dpi=DPI, bbox_inches='tight')
+        save_figure(output_path)
         plt.close()
         
         logger.success(f"Saved zone category chart to {output_path}")
-        
-        con.close()
+        return True
         
     except Exception as e:
         logger.error(f"Failed to create zone category chart: {e}")
+        return False
 
 
-def create_leakage_chart() -> None:
+def create_leakage_chart(df: pd.DataFrame) -> bool:
     """
     Create chart showing leakage analysis.
+    
+    Args:
+        df: Daily summary from fetch_all_chart_data()
+    
+    Returns:
+        True if the chart was saved, False otherwise
     """
     
     try:
         logger.info("Creating leakage chart...")
         
-        con = duckdb.connect()
-        
-        # Daily leakage rate
-        query = f"""
-        SELECT 
-            trip_date,
-            SUM(trips_with_surcharge) as with_surcharge,
-            SUM(trips_without_surcharge) as without_surcharge
-        FROM read_parquet('{AGGREGATED_DIR}/trips_by_zone_category.parquet')
-        WHERE after_congestion_start = 1
-        GROUP BY trip_date
-        ORDER BY trip_date
-        """
-        
-        df = con.execute(query).df()
+        # Daily leakage since the toll started, as plain arrays; the
+        # leakage band sits on top of the compliant trips
+        after = df['after_congestion_start'].to_numpy() == 1
+        dates = df['trip_date'].to_numpy()[after]
+        with_surcharge = df['with_surcharge'].to_numpy()[after]
+        total = with_surcharge + df['without_surcharge'].to_numpy()[after]
         
         # Create stacked area chart
-        fig, ax = plt.subplots(figsize=FIGSIZE, dpi=DPI)
+        fig, ax = plt.subplots(figsize=FIGSIZE)
         
         # Plot stacked areas
-        ax.fill_between(df['trip_date'], 0, df['with_surcharge'], 
+        ax.fill_between(dates, 0, with_surcharge, 
                         color='#2ECC71', alpha=0.7, label='With Surcharge')
-        ax.fill_between(df['trip_date'], df['with_surcharge'], 
-                        df['with_surcharge'] + df['without_surcharge'], 
+        ax.fill_between(dates, with_surcharge, total, 
                         color='#E74C3C', alpha=0.7, label='Without Surcharge (Leakage)')
         
         # Formatting
         ax.set_title('Congestion Toll Leakage Analysis', fontsize=16, fontweight='bold', pad=20)
         ax.set_xlabel('Date', fontsize=12, fontweight='bold')
         ax.set_ylabel('Number of Trips', fontsize=12, fontweight='bold')
-        ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{int(x):,}'))
+        ax.yaxis.set_major_formatter(StrMethodFormatter('{x:,.0f}'))
         ax.legend(loc='upper left')
         ax.grid(True, alpha=0.3)
         
@@ -288,20 +328,23 @@ def create_leakage_chart() -> None:
         
         # Save
         output_path = FIGURES_DIR / "leakage_analysis.png"
-        plt.savefig(output_path, dpi=DPI, bbox_inches='tight')
+        save_figure(output_path)
         plt.close()
         
         logger.success(f"Saved leakage chart to {output_path}")
-        
-        con.close()
+        return True
         
     except Exception as e:
         logger.error(f"Failed to create leakage chart: {e}")
+        return False
 
 
-def create_all_visualizations() -> None:
+def create_all_visualizations() -> bool:
     """
     Create all visualizations for the audit report.
+    
+    Returns:
+        True if every chart was saved, False otherwise
     """
     
     logger.info("=" * 60)
@@ -311,13 +354,43 @@ def create_all_visualizations() -> None:
     # Create output directory
     FIGURES_DIR.mkdir(parents=True, exist_ok=True)
     
-    # Create charts
-    create_time_series_chart()
-    create_revenue_chart()
-    create_zone_category_chart()
-    create_leakage_chart()
+    # Load the small Phase 5 rollups once and hand each chart its frame
+    con = connect()
+    try:
+        daily, categories = fetch_all_chart_data(con)
+    except Exception as e:
+        logger.error(f"Failed to load chart data: {e}")
+        return False
+    finally:
+        con.close()
+    
+    # Create charts. They share no state and write different files, so each
+    # renders in its own process; the PNG encoding at 300 DPI is the slow
+    # part and this spreads it over the cores. Workers are started from a
+    # forkserver (spawn where that is unavailable) rather than forked: Phase 8
+    # runs alongside the Phase 9 thread, and forking a multi-threaded process
+    # can copy a lock another thread is holding into the child
+    charts = [
+        (create_time_series_chart, daily),
+        (create_revenue_chart, daily),
+        (create_zone_category_chart, categories),
+        (create_leakage_chart, daily),
+    ]
+    
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    with ProcessPoolExecutor(
+        max_workers=min(len(charts), os.cpu_count() or 1),
+        mp_context=multiprocessing.get_context(start_method),
+    ) as executor:
+        futures = [executor.submit(chart, df) for chart, df in charts]
+        results = [future.result() for future in futures]
+    
+    if not all(results):
+        logger.error("Some visualizations failed")
+        return False
     
     logger.success("All visualizations created!")
+    return True
 
 
 if __name__ == "__main__":
@@ -334,5 +407,6 @@ if __name__ == "__main__":
     Time: ~2-5 minutes
     """
     
-    create_all_visualizations()
-    sys.exit(0)
+    configure_logging(LOGS_DIR / "visualization.log", rotation="10 MB")
+    
+    sys.exit(0 if create_all_visualizations() else 1)
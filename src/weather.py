@@ -21,19 +21,17 @@ import duckdb
 from pathlib import Path
 from loguru import logger
 import sys
+import time
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
 from .config import (
     AGGREGATED_DIR, WEATHER_STATION, 
-    WEATHER_START_DATE, WEATHER_END_DATE, LOGS_DIR
+    WEATHER_START_DATE, WEATHER_END_DATE, WEATHER_CACHE_TTL_HOURS,
+    CACHE_DIR, LOGS_DIR, configure_logging
 )
 
-# Setup logging
-logger.remove()
-logger.add(sys.stderr, format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}")
-logger.add(LOGS_DIR / "weather.log", rotation="10 MB")
-
 
 def fetch_weather_data() -> pd.DataFrame:
     """
@@ -47,8 +45,18 @@ def fetch_weather_data() -> pd.DataFrame:
     - prcp: Precipitation (mm)
     - wspd: Wind speed (km/h)
     - pres: Atmospheric pressure (hPa)
+    
+    The result is cached as parquet (keyed by the date range) and reused
+    for WEATHER_CACHE_TTL_HOURS, so re-runs don't go back to Meteostat.
     """
     
+    cache_path = CACHE_DIR / f"weather_{WEATHER_START_DATE}_{WEATHER_END_DATE}.parquet"
+    
+    if cache_path.exists() and time.time() - cache_path.stat().st_mtime < WEATHER_CACHE_TTL_HOURS * 3600:
+        data = pd.read_parquet(cache_path)
+        logger.info(f"Loaded {len(data)} days of weather data from cache")
+        return data
+    
     try:
         logger.info("Fetching weather data from Meteostat...")
         
@@ -70,6 +78,9 @@ def fetch_weather_data() -> pd.DataFrame:
         
         logger.success(f"Fetched {len(data)} days of weather data")
         
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        data.to_parquet(cache_path, compression='zstd', index=False)
+        
         return data
         
     except Exception as e:
@@ -77,7 +88,18 @@ def fetch_weather_data() -> pd.DataFrame:
         return pd.DataFrame()
 
 
-def join_weather_with_trips() -> None:
+def _pearson(x: np.ndarray, y: np.ndarray) -> float:
+    """
+    Pearson correlation of x and y over the days where both are known
+    (same pairwise NaN handling as DataFrame.corr()).
+    """
+    known = ~(np.isnan(x) | np.isnan(y))
+    if known.sum() < 2:
+        return np.nan
+    return np.corrcoef(x[known], y[known])[0, 1]
+
+
+def join_weather_with_trips() -> bool:
     """
     Join weather data with trip data.
     
@@ -85,6 +107,9 @@ def join_weather_with_trips() -> None:
     - Daily trip counts
     - Daily weather metrics
     - Correlation analysis
+    
+    Returns:
+        True if the weather join was saved, False otherwise
     """
     
     try:
@@ -95,53 +120,62 @@ def join_weather_with_trips() -> None:
         
         if weather_df.empty:
             logger.error("No weather data available")
-            return
+            return False
         
         con = duckdb.connect()
         
-        # Load trip data
-        trip_query = f"""
+        # Join daily trip totals with the weather in DuckDB: the weather
+        # frame is scanned in place and both sides are matched as native
+        # DATE values, so no Python date objects are built for the join
+        con.register('weather', weather_df)
+        
+        join_query = f"""
         SELECT 
-            trip_date,
-            SUM(trip_count) as total_trips,
-            AVG(avg_fare) as avg_fare,
-            SUM(total_congestion_collected) as congestion_revenue
-        FROM read_parquet('{AGGREGATED_DIR}/trips_by_zone_category.parquet')
-        GROUP BY trip_date
-        ORDER BY trip_date
+            t.*,
+            w.* EXCLUDE (date),
+            -- Calculate elasticity metrics
+            -- Elasticity = % change in trips / % change in precipitation
+            COALESCE(w.prcp, 0) as prcp_filled,
+            CASE WHEN COALESCE(w.prcp, 0) > 1.0 THEN 1 ELSE 0 END as is_rainy_day
+        FROM (
+            SELECT 
+                trip_date,
+                CAST(trip_date AS DATE) as date,
+                -- SUM(BIGINT) is a HUGEINT, which Arrow only carries as a
+                -- decimal; trip totals fit comfortably in BIGINT
+                CAST(SUM(trip_count) AS BIGINT) as total_trips,
+                AVG(avg_fare) as avg_fare,
+                SUM(total_congestion_collected) as congestion_revenue
+            FROM read_parquet('{AGGREGATED_DIR}/trips_by_zone_category.parquet')
+            GROUP BY trip_date
+        ) t
+        LEFT JOIN weather w ON t.date = CAST(w.date AS DATE)
+        ORDER BY t.trip_date
         """
         
-        trip_df = con.execute(trip_query).df()
-        
-        # Join with weather data
-        # Convert trip_date to date type for joining
-        trip_df['date'] = pd.to_datetime(trip_df['trip_date']).dt.date
-        weather_df['date'] = pd.to_datetime(weather_df['date']).dt.date
-        
-        # Merge
-        merged_df = trip_df.merge(weather_df, on='date', how='left')
+        merged = con.execute(join_query).arrow()
         
-        # Calculate elasticity metrics
-        # Elasticity = % change in trips / % change in precipitation
-        merged_df['prcp_filled'] = merged_df['prcp'].fillna(0)
-        merged_df['is_rainy_day'] = (merged_df['prcp_filled'] > 1.0).astype(int)
-        
-        # Save joined data
+        # Save joined data straight from the Arrow result
         output_path = AGGREGATED_DIR / "weather_joined.parquet"
-        con.execute(f"COPY (SELECT * FROM merged_df) TO '{output_path}' (FORMAT PARQUET)")
+        con.register('merged', merged)
+        con.execute(f"COPY merged TO '{output_path}' (FORMAT PARQUET, COMPRESSION ZSTD)")
         
         logger.success(f"Saved weather-joined data to {output_path}")
         
-        # Calculate correlation
-        correlation = merged_df[['total_trips', 'prcp_filled', 'tavg']].corr()
+        # The statistics only need these columns, taken as plain NumPy arrays
+        trips = merged.column('total_trips').to_numpy().astype(np.float64)
+        prcp = merged.column('prcp_filled').to_numpy().astype(np.float64)
+        tavg = merged.column('tavg').to_numpy().astype(np.float64)
+        rainy = merged.column('is_rainy_day').to_numpy() == 1
         
+        # Calculate correlation
         logger.info("\nCorrelation Analysis:")
-        logger.info(f"  Trips vs Precipitation: {correlation.loc['total_trips', 'prcp_filled']:.3f}")
-        logger.info(f"  Trips vs Temperature: {correlation.loc['total_trips', 'tavg']:.3f}")
+        logger.info(f"  Trips vs Precipitation: {_pearson(trips, prcp):.3f}")
+        logger.info(f"  Trips vs Temperature: {_pearson(trips, tavg):.3f}")
         
         # Calculate rain tax effect
-        rainy_avg = merged_df[merged_df['is_rainy_day'] == 1]['total_trips'].mean()
-        dry_avg = merged_df[merged_df['is_rainy_day'] == 0]['total_trips'].mean()
+        rainy_avg = trips[rainy].mean() if rainy.any() else np.nan
+        dry_avg = trips[~rainy].mean() if (~rainy).any() else np.nan
         rain_tax_pct = ((rainy_avg - dry_avg) / dry_avg * 100) if dry_avg > 0 else 0
         
         logger.info(f"\nRain Tax Effect:")
@@ -150,9 +184,11 @@ def join_weather_with_trips() -> None:
         logger.info(f"  Rain tax (% increase): {rain_tax_pct:.1f}%")
         
         con.close()
+        return True
         
     except Exception as e:
         logger.error(f"Failed to join weather data: {e}")
+        return False
 
 
 if __name__ == "__main__":
@@ -170,6 +206,10 @@ if __name__ == "__main__":
     Time: ~2-5 minutes
     """
     
-    join_weather_with_trips()
-    logger.success("Weather integration completed!")
-    sys.exit(0)
+    configure_logging(LOGS_DIR / "weather.log", rotation="10 MB")
+    
+    if join_weather_with_trips():
+        logger.success("Weather integration completed!")
+        sys.exit(0)
+    else:
+        sys.exit(1)
@@ -31,19 +31,57 @@ Why this matters:
 
 import duckdb
 import geopandas as gpd
+import gzip
+import pickle
+from functools import lru_cache
 from pathlib import Path
+from shapely.geometry import Polygon
 from loguru import logger
 import sys
 
 from .config import (
     UNIFIED_DIR, TAXI_ZONES_DIR, AGGREGATED_DIR,
-    CONGESTION_START_DATE, LOGS_DIR
+    CONGESTION_START_DATE, CACHE_DIR, LOGS_DIR, configure_logging
 )
+from .cache import causal_hash
 
-# Setup logging
-logger.remove()
-logger.add(sys.stderr, format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {message}")
-logger.add(LOGS_DIR / "zones.log", rotation="10 MB")
+# Congestion Relief Zone boundary (lon/lat, WGS84): Manhattan south of
+# 60th Street. The northern edge follows 60th Street's diagonal across the
+# island, from the East River (~York Ave) to the Hudson (~12th Ave); the
+# other edges lie out in the rivers / harbour, so together with the
+# borough filter this is "Manhattan below 60th"
+CONGESTION_ZONE_BOUNDARY = Polygon([
+    (-74.0300, 40.6900),
+    (-73.9550, 40.6900),
+    (-73.9580, 40.7600),
+    (-73.9940, 40.7740),
+    (-74.0300, 40.7740),
+])
+
+
+@lru_cache(maxsize=1)
+def _read_taxi_zones(shapefile_path: Path, mtime_ns: int) -> gpd.GeoDataFrame:
+    """
+    Parse the shapefile, reusing a pickled copy when the files are unchanged.
+    
+    The pickle is keyed by the hash of the .shp/.dbf/.shx/.prj files, so a new
+    shapefile download invalidates it; mtime_ns keys the in-process cache.
+    """
+    
+    key = causal_hash("taxi_zones", list(shapefile_path.parent.glob(f"{shapefile_path.stem}.*")))
+    pickle_path = CACHE_DIR / f"taxi_zones_{key}.pkl.gz"
+    
+    if pickle_path.exists():
+        with gzip.open(pickle_path, 'rb') as f:
+            return pickle.load(f)
+    
+    zones = gpd.read_file(shapefile_path)
+    
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with gzip.open(pickle_path, 'wb') as f:
+        pickle.dump(zones, f)
+    
+    return zones
 
 
 def load_taxi_zones() -> gpd.GeoDataFrame:
@@ -68,7 +106,7 @@ def load_taxi_zones() -> gpd.GeoDataFrame:
             return None
         
         logger.info("Loading taxi zone shapefiles...")
-        zones = gpd.read_file(shapefile_path)
+        zones = _read_taxi_zones(shapefile_path, shapefile_path.stat().st_mtime_ns)
         
         logger.success(f"Loaded {len(zones)} taxi zones")
         return zones
@@ -94,7 +132,8 @@ def identify_congestion_zones(zones: gpd.GeoDataFrame) -> list:
     
     How to identify:
     - Filter zones where borough = 'Manhattan'
-    - Filter zones south of 60th Street (approximate latitude)
+    - Keep zones whose centroid lies inside CONGESTION_ZONE_BOUNDARY
+      (zones straddling 60th Street go by where most of their area is)
     - Manually verify against official TLC list
     """
     
@@ -104,25 +143,12 @@ def identify_congestion_zones(zones: gpd.GeoDataFrame) -> list:
         # Filter Manhattan zones
         manhattan_zones = zones[zones['borough'] == 'Manhattan'].copy()
         
-        # Get zone names and IDs
-        # These are the zones south of 60th Street (approximate)
-        # In production, you'd verify against official TLC list
-        
-        # For now, we'll use a heuristic: zones with lower LocationIDs
-        # tend to be in lower Manhattan
+        # Centroids are taken in the shapefile's projected CRS (NY State
+        # Plane, feet) and only then converted to lon/lat for the boundary test
+        centroids = manhattan_zones.geometry.centroid.to_crs(epsg=4326)
         
-        # Official congestion zone includes these Manhattan neighborhoods:
-        congestion_keywords = [
-            'Financial', 'Battery', 'Tribeca', 'SoHo', 'Chinatown',
-            'Lower East Side', 'East Village', 'West Village', 'Greenwich',
-            'Chelsea', 'Gramercy', 'Murray Hill', 'Midtown', 'Clinton',
-            'Garment', 'Times Square', 'Penn Station', 'Flatiron'
-        ]
-        
-        # Filter zones matching keywords
-        congestion_zones = manhattan_zones[
-            manhattan_zones['zone'].str.contains('|'.join(congestion_keywords), case=False, na=False)
-        ]
+        # Filter zones south of 60th Street
+        congestion_zones = manhattan_zones[centroids.within(CONGESTION_ZONE_BOUNDARY)]
         
         zone_ids = congestion_zones['LocationID'].tolist()
         
@@ -136,7 +162,7 @@ def identify_congestion_zones(zones: gpd.GeoDataFrame) -> list:
         return []
 
 
-def classify_trips_by_zone(congestion_zone_ids: list) -> None:
+def classify_trips_by_zone(congestion_zone_ids: list) -> bool:
     """
     Classify all trips by their relationship to the congestion zone.
     
@@ -148,6 +174,9 @@ def classify_trips_by_zone(congestion_zone_ids: list) -> None:
     - entering_zone: Pickup outside, dropoff inside
     - exiting_zone: Pickup inside, dropoff outside
     - outside_zone: Neither in zone
+    
+    Returns:
+        True if the classification was saved, False otherwise
     """
     
     try:
@@ -155,51 +184,67 @@ def classify_trips_by_zone(congestion_zone_ids: list) -> None:
         
         con = duckdb.connect()
         
-        # Convert zone IDs to SQL list
-        zone_ids_str = ','.join(map(str, congestion_zone_ids))
+        # Zone IDs as a lookup table, so membership is a hash join on the
+        # location ID rather than an IN list evaluated per row
+        con.execute(
+            "CREATE TEMP TABLE congestion_zones AS SELECT DISTINCT UNNEST(?::INTEGER[]) AS location_id",
+            [[int(zone_id) for zone_id in congestion_zone_ids]]
+        )
         
         # Get all clean trip files
         clean_files = list(UNIFIED_DIR.glob("*clean*.parquet"))
         
         if not clean_files:
             logger.warning("No clean trip files found")
-            return
-        
-        # Classify trips
-        classify_query = f"""
-        CREATE TEMP TABLE classified_trips AS
-        SELECT 
-            *,
-            -- Check if pickup is in congestion zone
-            CASE WHEN pickup_loc IN ({zone_ids_str}) THEN 1 ELSE 0 END as pickup_in_zone,
-            
-            -- Check if dropoff is in congestion zone
-            CASE WHEN dropoff_loc IN ({zone_ids_str}) THEN 1 ELSE 0 END as dropoff_in_zone,
-            
-            -- Classify trip type
-            CASE 
-                WHEN pickup_loc IN ({zone_ids_str}) AND dropoff_loc IN ({zone_ids_str}) 
-                    THEN 'inside_zone'
-                WHEN pickup_loc NOT IN ({zone_ids_str}) AND dropoff_loc IN ({zone_ids_str}) 
-                    THEN 'entering_zone'
-                WHEN pickup_loc IN ({zone_ids_str}) AND dropoff_loc NOT IN ({zone_ids_str}) 
-                    THEN 'exiting_zone'
-                ELSE 'outside_zone'
-            END as zone_category,
-            
-            -- Check if trip is after congestion pricing started
-            CASE WHEN pickup_time >= '{CONGESTION_START_DATE}' THEN 1 ELSE 0 END as after_congestion_start
-            
-        FROM read_parquet('{UNIFIED_DIR}/*clean*.parquet')
-        """
-        
-        con.execute(classify_query)
+            con.close()
+            return False
         
-        # Save classified trips (aggregated)
+        # Classify and aggregate in one statement. Nothing is materialised
+        # per trip: the inner query reads only the columns the aggregate
+        # uses, zone membership is looked up once per pickup/dropoff, and the
+        # category is derived from the two flags.
         output_path = AGGREGATED_DIR / "trips_by_zone_category.parquet"
         
         save_query = f"""
         COPY (
+            WITH classified_trips AS (
+                SELECT 
+                    pickup_time,
+                    fare,
+                    total_amount,
+                    trip_distance,
+                    congestion_surcharge,
+                    -- Classify trip type
+                    CASE 
+                        WHEN pickup_in_zone = 1 AND dropoff_in_zone = 1 
+                            THEN 'inside_zone'
+                        WHEN pickup_in_zone = 0 AND dropoff_in_zone = 1 
+                            THEN 'entering_zone'
+                        WHEN pickup_in_zone = 1 AND dropoff_in_zone = 0 
+                            THEN 'exiting_zone'
+                        ELSE 'outside_zone'
+                    END as zone_category,
+                    after_congestion_start
+                FROM (
+                    SELECT 
+                        trips.pickup_time,
+                        trips.fare,
+                        trips.total_amount,
+                        trips.trip_distance,
+                        trips.congestion_surcharge,
+                        -- Check if pickup is in congestion zone
+                        CASE WHEN pz.location_id IS NOT NULL THEN 1 ELSE 0 END as pickup_in_zone,
+                        
+                        -- Check if dropoff is in congestion zone
+                        CASE WHEN dz.location_id IS NOT NULL THEN 1 ELSE 0 END as dropoff_in_zone,
+                        
+                        -- Check if trip is after congestion pricing started
+                        CASE WHEN trips.pickup_time >= '{CONGESTION_START_DATE}' THEN 1 ELSE 0 END as after_congestion_start
+                    FROM read_parquet('{UNIFIED_DIR}/*clean*.parquet') trips
+                    LEFT JOIN congestion_zones pz ON trips.pickup_loc = pz.location_id
+                    LEFT JOIN congestion_zones dz ON trips.dropoff_loc = dz.location_id
+                )
+            )
             SELECT 
                 DATE_TRUNC('day', pickup_time) as trip_date,
                 zone_category,
@@ -215,53 +260,141 @@ def classify_trips_by_zone(congestion_zone_ids: list) -> None:
                 SUM(CASE WHEN congestion_surcharge IS NULL OR congestion_surcharge = 0 THEN 1 ELSE 0 END) as trips_without_surcharge
             FROM classified_trips
             GROUP BY trip_date, zone_category, after_congestion_start
+            -- Written in date order so each row group covers a narrow date
+            -- range and its min/max statistics let date filters skip it
+            ORDER BY trip_date, zone_category, after_congestion_start
         )
-        TO '{output_path}' (FORMAT PARQUET)
+        TO '{output_path}' (FORMAT PARQUET, ROW_GROUP_SIZE 100000, COMPRESSION ZSTD)
         """
         
         con.execute(save_query)
         
-        # Get summary statistics
-        summary_query = """
+        # Pre-aggregate the (tiny) per-category rollup the dashboard reads, so it
+        # doesn't have to re-aggregate the daily file on every launch
+        summary_path = AGGREGATED_DIR / "dashboard_summary.parquet"
+        
+        dashboard_query = f"""
+        COPY (
+            SELECT 
+                zone_category,
+                after_congestion_start,
+                -- SUM of a BIGINT count is a HUGEINT, which parquet stores
+                -- as DOUBLE; counts fit comfortably in BIGINT
+                CAST(SUM(trip_count) AS BIGINT) as trips,
+                SUM(total_congestion_collected) as revenue,
+                CAST(SUM(trips_with_surcharge) AS BIGINT) as trips_with_surcharge,
+                CAST(SUM(trips_without_surcharge) AS BIGINT) as trips_without_surcharge,
+                SUM(avg_fare) as fare_sum,
+                COUNT(avg_fare) as fare_count,
+                SUM(avg_distance) as distance_sum,
+                COUNT(avg_distance) as distance_count
+            FROM read_parquet('{output_path}')
+            GROUP BY zone_category, after_congestion_start
+        )
+        TO '{summary_path}' (FORMAT PARQUET)
+        """
+        
+        con.execute(dashboard_query)
+        
+        # One-row post-implementation rollup for the PDF audit report, so the
+        # report reads a single row instead of re-aggregating the daily file
+        audit_stats_path = AGGREGATED_DIR / "audit_stats.parquet"
+        
+        audit_stats_query = f"""
+        COPY (
+            SELECT 
+                CAST(SUM(trip_count) AS BIGINT) as total_trips,
+                SUM(total_congestion_collected) as total_revenue,
+                CAST(SUM(trips_with_surcharge) AS BIGINT) as trips_with_surcharge,
+                CAST(SUM(trips_without_surcharge) AS BIGINT) as trips_without_surcharge,
+                AVG(avg_fare) as avg_fare,
+                AVG(avg_distance) as avg_distance
+            FROM read_parquet('{output_path}')
+            WHERE after_congestion_start = 1
+        )
+        TO '{audit_stats_path}' (FORMAT PARQUET)
+        """
+        
+        con.execute(audit_stats_query)
+        
+        # One row per day for the Phase 8 charts, which only need daily
+        # totals. after_congestion_start is fixed for a given day, so it is
+        # kept as a column for the post-implementation charts to filter on
+        daily_summary_path = AGGREGATED_DIR / "daily_summary.parquet"
+        
+        daily_summary_query = f"""
+        COPY (
+            SELECT 
+                trip_date,
+                after_congestion_start,
+                CAST(SUM(trip_count) AS BIGINT) as total_trips,
+                SUM(total_congestion_collected) as daily_revenue,
+                CAST(SUM(trips_with_surcharge) AS BIGINT) as with_surcharge,
+                CAST(SUM(trips_without_surcharge) AS BIGINT) as without_surcharge
+            FROM read_parquet('{output_path}')
+            GROUP BY trip_date, after_congestion_start
+            ORDER BY trip_date
+        )
+        TO '{daily_summary_path}' (FORMAT PARQUET)
+        """
+        
+        con.execute(daily_summary_query)
+        
+        # Get summary statistics. dashboard_summary.parquet already holds
+        # the per-category/period totals, so this is a read of a handful of
+        # rows; the per-trip average surcharge is revenue over trips
+        summary_query = f"""
         SELECT 
             zone_category,
             after_congestion_start,
-            COUNT(*) as trip_count,
-            AVG(COALESCE(congestion_surcharge, 0)) as avg_surcharge
-        FROM classified_trips
-        GROUP BY zone_category, after_congestion_start
+            trips as trip_count,
+            revenue / trips as avg_surcharge
+        FROM read_parquet('{summary_path}')
         ORDER BY zone_category, after_congestion_start
         """
         
         results = con.execute(summary_query).fetchall()
         
-        logger.info("\nTrip Classification Summary:")
-        logger.info("-" * 80)
-        logger.info(f"{'Category':<20} {'Period':<15} {'Trip Count':>15} {'Avg Surcharge':>15}")
-        logger.info("-" * 80)
+        # Build the table and log it as one record
+        lines = [
+            "\nTrip Classification Summary:",
+            "-" * 80,
+            f"{'Category':<20} {'Period':<15} {'Trip Count':>15} {'Avg Surcharge':>15}",
+            "-" * 80,
+        ]
         
         for row in results:
             category, after_start, count, avg_surcharge = row
             period = "After Jan 5" if after_start else "Before Jan 5"
-            logger.info(f"{category:<20} {period:<15} {count:>15,} ${avg_surcharge:>14.2f}")
+            lines.append(f"{category:<20} {period:<15} {count:>15,} ${avg_surcharge:>14.2f}")
+        
+        logger.info("\n".join(lines))
         
         logger.success(f"Saved zone classification to {output_path}")
         
         con.close()
+        return True
         
     except Exception as e:
         logger.error(f"Failed to classify trips: {e}")
+        return False
 
 
-def analyze_zone_patterns() -> None:
+def analyze_zone_patterns(congestion_zone_ids: list) -> bool:
     """
     Analyze congestion zone patterns for insights.
     
+    Args:
+        congestion_zone_ids: List of LocationIDs in congestion zone
+    
     Creates aggregated files for:
     - Top pickup locations entering zone
     - Top dropoff locations exiting zone
     - Hourly patterns
     - Day of week patterns
+    
+    Returns:
+        True if the analysis was saved, False otherwise
     """
     
     try:
@@ -269,7 +402,14 @@ def analyze_zone_patterns() -> None:
         
         con = duckdb.connect()
         
+        # Same zone lookup table as classify_trips_by_zone
+        con.execute(
+            "CREATE TEMP TABLE congestion_zones AS SELECT DISTINCT UNNEST(?::INTEGER[]) AS location_id",
+            [[int(zone_id) for zone_id in congestion_zone_ids]]
+        )
+        
         # Analyze top pickup locations for trips entering zone
+        # (picked up outside the zone, dropped off inside it)
         pickup_query = f"""
         COPY (
             SELECT 
@@ -281,21 +421,24 @@ def analyze_zone_patterns() -> None:
                 ROUND(100.0 * SUM(CASE WHEN congestion_surcharge > 0 THEN 1 ELSE 0 END) / COUNT(*), 2) as compliance_pct
             FROM read_parquet('{UNIFIED_DIR}/*clean*.parquet')
             WHERE pickup_time >= '{CONGESTION_START_DATE}'
-              AND dropoff_loc IN (SELECT DISTINCT pickup_loc FROM read_parquet('{AGGREGATED_DIR}/trips_by_zone_category.parquet'))
+              AND dropoff_loc IN (SELECT location_id FROM congestion_zones)
+              AND pickup_loc NOT IN (SELECT location_id FROM congestion_zones)
             GROUP BY pickup_loc
             ORDER BY trip_count DESC
             LIMIT 100
         )
-        TO '{AGGREGATED_DIR}/top_pickup_locations_entering_zone.parquet' (FORMAT PARQUET)
+        TO '{AGGREGATED_DIR}/top_pickup_locations_entering_zone.parquet' (FORMAT PARQUET, COMPRESSION ZSTD)
         """
         
         con.execute(pickup_query)
         logger.success("Saved top pickup locations analysis")
         
         con.close()
+        return True
         
     except Exception as e:
         logger.error(f"Failed to analyze zone patterns: {e}")
+        return False
 
 
 if __name__ == "__main__":
@@ -314,6 +457,8 @@ if __name__ == "__main__":
     Time: ~10-20 minutes
     """
     
+    configure_logging(LOGS_DIR / "zones.log", rotation="10 MB")
+    
     # Create output directory
     AGGREGATED_DIR.mkdir(parents=True, exist_ok=True)
     
@@ -325,14 +470,13 @@ if __name__ == "__main__":
         congestion_zone_ids = identify_congestion_zones(zones)
         
         if congestion_zone_ids:
-            # Classify trips
-            classify_trips_by_zone(congestion_zone_ids)
-            
-            # Analyze patterns
-            analyze_zone_patterns()
-            
-            logger.success("Congestion zone analysis completed!")
-            sys.exit(0)
+            # Classify trips, then analyze patterns
+            if classify_trips_by_zone(congestion_zone_ids) and analyze_zone_patterns(congestion_zone_ids):
+                logger.success("Congestion zone analysis completed!")
+                sys.exit(0)
+            else:
+                logger.error("Congestion zone analysis failed")
+                sys.exit(1)
         else:
             logger.error("Failed to identify congestion zones")
             sys.exit(1)